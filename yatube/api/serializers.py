@@ -0,0 +1,45 @@
+from django.conf import settings
+
+# Поле ответа -> поле для `.values()`; экземпляры моделей не создаются.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+def parse_fields(request, available):
+    """Разреженный набор полей из `?fields=a,b`; по умолчанию — все."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(unknown)}')
+    return names
+
+
+def values(queryset, names, available, extra=()):
+    lookups = {available[name] for name in names}
+    return queryset.values(*lookups.union(extra))
+
+
+def serialize(row, names, available):
+    data = {name: row[available[name]] for name in names}
+    if 'image' in data:
+        data['image'] = (
+            settings.MEDIA_URL + data['image'] if data['image'] else None)
+    return data
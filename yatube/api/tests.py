@@ -0,0 +1,100 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Курсорная пагинация ленты проходит все посты без повторов,
+        курсор со значениями не тех типов — ошибка 400
+      2.Разреженный набор полей
+      3.Пакетное получение постов по id
+      4.Лента подписок требует авторизации
+      5.Комментарии поста
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test-slug-group',
+            description='test-description'
+        )
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.user,
+                                group=cls.group)
+            for number in range(5)
+        ]
+        Comment.objects.create(post=cls.posts[0], author=cls.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_cursor_pagination(self):
+        url = reverse('api:group_posts', kwargs={'slug': 'test-slug-group'})
+        seen = []
+        data = self.guest_client.get(url, {'limit': 2}).json()
+        seen += [post['id'] for post in data['results']]
+        while data['next']:
+            data = self.guest_client.get(
+                url, {'limit': 2, 'cursor': data['next']}).json()
+            seen += [post['id'] for post in data['results']]
+        self.assertEqual(seen, [post.id for post in reversed(self.posts)])
+        pub_date = self.posts[0].pub_date.isoformat()
+        for values in (['abc', 1], [{'a': 1}, 1], [pub_date, '1'],
+                       [pub_date, True], [pub_date[:19], 1],
+                       [pub_date, 2 ** 70]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()).decode()
+            response = self.guest_client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_sparse_fields(self):
+        data = self.guest_client.get(
+            reverse('api:index'), {'fields': 'id,author'}).json()
+        self.assertEqual(data['results'][0], {
+            'id': self.posts[-1].id, 'author': 'TestAuthor'})
+        response = self.guest_client.get(
+            reverse('api:index'), {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch(self):
+        ids = f'{self.posts[2].id},999,{self.posts[0].id}'
+        data = self.guest_client.get(
+            reverse('api:posts_batch'), {'ids': ids, 'fields': 'id,text'}
+        ).json()
+        self.assertEqual(data['results'], [
+            {'id': self.posts[2].id, 'text': 'Пост 2'},
+            {'id': self.posts[0].id, 'text': 'Пост 0'},
+        ])
+
+    def test_follow_requires_login(self):
+        url = reverse('api:follow_index')
+        self.assertEqual(self.guest_client.get(url).status_code, 401)
+        data = self.reader_client.get(url).json()
+        self.assertEqual(len(data['results']), 5)
+
+    def test_post_and_comments(self):
+        post = self.posts[0]
+        data = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.id})).json()
+        self.assertEqual(data['group'], 'test-slug-group')
+        data = self.guest_client.get(
+            reverse('api:post_comments', kwargs={'post_id': post.id})).json()
+        self.assertEqual(data['results'][0]['author'], 'Reader')
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': 999}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from core.pagination import merged_keyset_page
+from posts.follows import subscription_feeds
+from posts.models import Comment, Group, Post
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, parse_fields,
+                          serialize, values)
+
+User = get_user_model()
+
+MAX_LIMIT = 100
+MAX_BATCH = 100
+
+
+def error(status, detail):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def parse_limit(request):
+    limit = request.GET.get('limit')
+    if limit is None:
+        return settings.POSTS_PER_PAGE
+    if not limit.isdigit() or not 0 < int(limit) <= MAX_LIMIT:
+        raise ValueError(f'limit должен быть от 1 до {MAX_LIMIT}')
+    return int(limit)
+
+
+def paginated(request, queryset, available, fields, descending=True):
+    """
+    Страница ленты с курсорной пагинацией по `fields`; кортеж querysets
+    сливается в одну ленту.
+    """
+    querysets = queryset if isinstance(queryset, tuple) else (queryset,)
+    try:
+        names = parse_fields(request, available)
+        rows, next_cursor = merged_keyset_page(
+            [values(queryset, names, available, extra=fields)
+             for queryset in querysets],
+            request.GET.get('cursor'), parse_limit(request),
+            fields=fields, descending=descending,
+        )
+    except ValueError as exception:
+        return error(400, str(exception))
+    return JsonResponse({
+        'results': [serialize(row, names, available) for row in rows],
+        'next': next_cursor,
+    })
+
+
+def posts_feed(request, queryset):
+    return paginated(request, queryset, POST_FIELDS, ('pub_date', 'id'))
+
+
+@require_GET
+def index(request):
+    return posts_feed(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list('id', flat=True)
+    if not group_id:
+        return error(404, 'Группа не найдена')
+    return posts_feed(request, Post.objects.filter(group_id=group_id[0]))
+
+
+@require_GET
+def profile(request, username):
+    author_id = User.objects.filter(
+        username=username).values_list('id', flat=True)
+    if not author_id:
+        return error(404, 'Пользователь не найден')
+    return posts_feed(request, Post.objects.filter(author_id=author_id[0]))
+
+
+@require_GET
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error(401, 'Требуется авторизация')
+    return posts_feed(request, subscription_feeds(request.user))
+
+
+@require_GET
+def post_detail(request, post_id):
+    try:
+        names = parse_fields(request, POST_FIELDS)
+    except ValueError as exception:
+        return error(400, str(exception))
+    row = values(Post.objects.filter(pk=post_id), names, POST_FIELDS).first()
+    if row is None:
+        return error(404, 'Пост не найден')
+    return JsonResponse(serialize(row, names, POST_FIELDS))
+
+
+@require_GET
+def post_comments(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return error(404, 'Пост не найден')
+    return paginated(
+        request, Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+        ('created', 'id'), descending=False,
+    )
+
+
+@require_GET
+def posts_batch(request):
+    """Посты по списку id `?ids=3,1,2` в порядке запроса."""
+    try:
+        names = parse_fields(request, POST_FIELDS)
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError as exception:
+        return error(400, str(exception))
+    if len(ids) > MAX_BATCH:
+        return error(400, f'Не больше {MAX_BATCH} id за запрос')
+    rows = {
+        row['id']: row for row in values(
+            Post.objects.filter(pk__in=ids), names, POST_FIELDS,
+            extra=('id',))
+    }
+    return JsonResponse({'results': [
+        serialize(rows[pk], names, POST_FIELDS) for pk in ids if pk in rows
+    ]})
@@ -0,0 +1,234 @@
+import hashlib
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.http import Http404
+
+
+def tag_key(tag):
+    """Теги могут содержать что угодно (slug, username), ключ — нет."""
+    return f'tag:{hashlib.md5(tag.encode()).hexdigest()}'
+
+
+def tag_versions(tags):
+    """
+    Счётчики тегов одним запросом к кешу. Отсутствующий счётчик (после
+    очистки кеша) инициализируется временем, чтобы не совпасть с прежним
+    значением.
+    """
+    keys = {tag_key(tag): tag for tag in set(tags)}
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = int(time.time() * 1000)
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+def tags_version(*tags):
+    """
+    Сводное поколение набора тегов. Каждый тег — счётчик в кеше; запись,
+    в ключ которой входит сводное поколение, становится недостижимой при
+    инвалидации любого из её тегов, без перебора зависимых ключей.
+    """
+    versions = tag_versions(tags)
+    return hashlib.md5(':'.join(
+        str(versions[tag]) for tag in sorted(versions, key=tag_key)
+    ).encode()).hexdigest()
+
+
+def invalidate_tags(*tags):
+    for tag in set(tags):
+        key = tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+
+
+def cache_tags(model, tags, track_changes=False):
+    """
+    Подключает инвалидацию к записи model: tags(instance) возвращает
+    теги кешированных данных, зависящих от строки. При сохранении и
+    удалении сбрасываются эти теги и кешированный экземпляр. С
+    track_changes сбрасываются и теги прежнего состояния строки (пост
+    перенесён в другую группу) — ценой запроса перед сохранением.
+    """
+    def remember(sender, instance, **kwargs):
+        instance._old_cache_tags = set()
+        if instance.pk:
+            old = sender._default_manager.filter(pk=instance.pk).first()
+            if old is not None:
+                instance._old_cache_tags = set(tags(old))
+
+    def invalidate(sender, instance, **kwargs):
+        invalidate_object(instance)
+        invalidate_tags(*tags(instance),
+                        *getattr(instance, '_old_cache_tags', ()))
+
+    if track_changes:
+        pre_save.connect(remember, sender=model, weak=False)
+    post_save.connect(invalidate, sender=model, weak=False)
+    post_delete.connect(invalidate, sender=model, weak=False)
+
+
+# Отметка "объекта нет" в кеше: None кеш не отличает от промаха
+MISSING = 'object:missing'
+
+
+def wait_for(key):
+    """Ждёт, пока значение ключа запишет процесс, взявший блокировку."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def read_through(key, loader, timeout, missing_timeout=None):
+    """
+    Значение из кеша, а при промахе — loader(). Загрузку выполняет один
+    процесс под блокировкой в кеше, остальные коротко ждут его результат,
+    чтобы промах популярного ключа не превращался в лавину запросов.
+    Если loader() вернул None, это запоминается на missing_timeout
+    секунд (по умолчанию не запоминается).
+    """
+    value = cache.get(key)
+    if value is None:
+        lock = f'{key}:lock'
+        if cache.add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+            try:
+                value = loader()
+                if value is not None:
+                    cache.set(key, value, timeout)
+                elif missing_timeout:
+                    cache.set(key, MISSING, missing_timeout)
+            finally:
+                cache.delete(lock)
+            return value
+        value = wait_for(key)
+        if value is None:
+            return loader()
+    return None if value == MISSING else value
+
+
+def recompute(key, loader, timeout, version):
+    lock = f'{key}:lock'
+    try:
+        started = time.monotonic()
+        value = loader()
+        delta = time.monotonic() - started
+        cache.set(key, (value, delta, time.time() + timeout, version),
+                  timeout + settings.CACHE_STALE_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return value
+
+
+def remember(key, loader, timeout, tags=(), beta=1.0):
+    """
+    Кеширует loader() на timeout секунд с защитой от лавины пересчёта:
+    - пересчитывает один процесс, взявший блокировку ключа;
+    - остальные тем временем получают прежнее значение: запись хранится
+      дольше своего срока на CACHE_STALE_TIMEOUT;
+    - до истечения срока запись пересчитывается заранее с вероятностью,
+      растущей к концу срока и с временем пересчёта (XFetch), так что
+      чаще всего срок не истекает вовсе. beta=0 отключает ранний пересчёт.
+    Запись устаревает и при сбросе любого из тегов tags.
+    """
+    version = tags_version(*tags) if tags else ''
+    lock = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires, stored_version = entry
+        early = -delta * beta * math.log(random.random() or 1e-300)
+        if stored_version == version and time.time() + early < expires:
+            return value
+        if not cache.add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+            return value
+        return recompute(key, loader, timeout, version)
+    if cache.add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        return recompute(key, loader, timeout, version)
+    entry = wait_for(key)
+    return loader() if entry is None else entry[0]
+
+
+def object_key(model, pk):
+    return f'object:{model._meta.label_lower}:{pk}'
+
+
+def alias_key(model, field, value):
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return f'object:{model._meta.label_lower}:{field}:{digest}'
+
+
+def get_cached_object(model, **lookup):
+    """
+    Экземпляр model по pk или уникальному полю (slug, username) через
+    кеш; None, если его нет. Экземпляр хранится под ключом pk, а ключ
+    уникального поля указывает на pk. Указатель не сбрасывается при
+    записи, поэтому значение поля у найденного экземпляра сверяется.
+    Отсутствие объекта кешируется на NOT_FOUND_CACHE_TIMEOUT секунд.
+    Для моделей из OBJECT_CACHE_FIELDS читаются только эти поля.
+    Экземпляр общий для всех запросов: для записи его читают из базы.
+    """
+    (field, value), = lookup.items()
+    queryset = model._default_manager.all()
+    fields = settings.OBJECT_CACHE_FIELDS.get(model._meta.label_lower)
+    if fields:
+        queryset = queryset.only(*fields)
+    timeout = settings.OBJECT_CACHE_TIMEOUT
+    missing = settings.NOT_FOUND_CACHE_TIMEOUT
+    if field in ('pk', model._meta.pk.name):
+        return read_through(object_key(model, value),
+                            lambda: queryset.filter(pk=value).first(),
+                            timeout, missing)
+    loaded = []
+
+    def load_pk():
+        instance = queryset.filter(**lookup).first()
+        if instance is None:
+            return None
+        cache.set(object_key(model, instance.pk), instance, timeout)
+        loaded.append(instance)
+        return instance.pk
+
+    key = alias_key(model, field, value)
+    pk = read_through(key, load_pk, timeout, missing)
+    if loaded or pk is None:
+        return loaded[0] if loaded else None
+    instance = read_through(object_key(model, pk),
+                            lambda: queryset.filter(pk=pk).first(), timeout)
+    if instance is not None and getattr(instance, field) == value:
+        return instance
+    cache.delete(key)
+    read_through(key, load_pk, timeout, missing)
+    return loaded[0] if loaded else None
+
+
+def get_cached_object_or_404(model, **lookup):
+    instance = get_cached_object(model, **lookup)
+    if instance is None:
+        raise Http404(f'No {model._meta.object_name} matches the query.')
+    return instance
+
+
+def invalidate_object(instance):
+    """
+    Сбрасывает экземпляр и ключи его уникальных полей, в том числе
+    закешированное отсутствие объекта с таким slug или username.
+    """
+    model = type(instance)
+    cache.delete_many([object_key(model, instance.pk)] + [
+        alias_key(model, field.name, getattr(instance, field.attname))
+        for field in model._meta.fields
+        if field.unique and not field.primary_key
+    ])
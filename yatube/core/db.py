@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import connection
+from django.template.base import Node
+
+logger = logging.getLogger('yatube.slow_queries')
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|\?')
+_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Нормализует SQL: литералы и списки параметров заменяются на `?`."""
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _IN_LISTS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def template_origin():
+    """Ищет в стеке ближайший узел шаблона, выполняющий запрос."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if isinstance(node, Node) and getattr(node, 'token', None):
+            origin = getattr(node, 'origin', None)
+            name = getattr(origin, 'template_name', None) or origin
+            return f'{name}:{node.token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """
+    Реестр медленных запросов процесса.
+    Полная запись (с планом запроса) пишется только для нового отпечатка,
+    повторы отмечаются в логе на 2-м, 4-м, 8-м... появлении.
+    """
+    def __init__(self, threshold_ms, max_fingerprints=1000):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, digest):
+        """Возвращает, сколько раз встречался отпечаток (с учётом этого)."""
+        with self._lock:
+            count = self._seen.pop(digest, 0) + 1
+            self._seen[digest] = count
+            if len(self._seen) > self.max_fingerprints:
+                self._seen.popitem(last=False)
+            return count
+
+
+class SlowQueryLogger:
+    """Обёртка `connection.execute_wrapper` для одного запроса к сайту."""
+    def __init__(self, log, request):
+        self.log = log
+        self.request = request
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - start
+            if duration >= self.log.threshold:
+                self.report(sql, params, many, duration)
+
+    def report(self, sql, params, many, duration):
+        normalized = fingerprint(sql)
+        digest = hashlib.md5(normalized.encode()).hexdigest()[:12]
+        count = self.log.record(digest)
+        if count > 1:
+            if count & (count - 1) == 0:
+                logger.warning('slow query %s repeated %d times',
+                               digest, count)
+            return
+        match = getattr(self.request, 'resolver_match', None)
+        logger.warning(
+            'slow query %s (%.1f ms)\n'
+            '  view: %s\n'
+            '  template: %s\n'
+            '  sql: %s\n'
+            '  plan:\n%s',
+            digest, duration * 1000,
+            match.view_name if match else self.request.path,
+            template_origin() or '-',
+            normalized,
+            self.explain(sql, params, many),
+        )
+
+    def explain(self, sql, params, many):
+        if many or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return '    -'
+        self._explaining = True
+        try:
+            prefix = connection.ops.explain_query_prefix()
+            with connection.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}', params)
+                rows = cursor.fetchall()
+        except Exception as error:
+            return f'    unavailable: {error}'
+        finally:
+            self._explaining = False
+        return '\n'.join(
+            '    ' + ' '.join(str(column) for column in row) for row in rows)
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Повторяет холодный старт воркера: настройка Django, реестр приложений
+# и импорт всех view через корневой URLconf.
+STARTUP_SCRIPT = '''
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+'''
+
+
+def parse_importtime(output):
+    """Разбирает вывод `python -X importtime` в список (self, cumulative,
+    module), время в микросекундах."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split(
+            '|', 2)
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+def error_output(output, returncode):
+    """Трейсбек дочернего процесса без строк `import time:`."""
+    lines = [
+        line for line in output.splitlines()
+        if line.strip() and not line.startswith('import time:')
+    ]
+    return '\n'.join(lines) or f'Процесс завершился с кодом {returncode}'
+
+
+class Command(BaseCommand):
+    help = 'Измеряет время импорта модулей при холодном старте воркера.'
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=25,
+            help='Сколько самых медленных модулей показать.',
+        )
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative',
+            help='Сортировка по собственному или накопленному времени.',
+        )
+        parser.add_argument(
+            '--budget', type=float,
+            help='Бюджет холодного старта в мс; при превышении — ошибка.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, env=os.environ.copy(),
+            cwd=settings.BASE_DIR,
+        )
+        wall_ms = (time.monotonic() - started) * 1000
+        if result.returncode:
+            raise CommandError(
+                error_output(result.stderr, result.returncode))
+
+        rows = parse_importtime(result.stderr)
+        column = 0 if options['sort'] == 'self' else 1
+        rows.sort(key=lambda row: row[column], reverse=True)
+        self.stdout.write(f'{"self, ms":>10} {"cumul., ms":>11}  module')
+        for self_us, cumulative_us, module in rows[:options['limit']]:
+            self.stdout.write(
+                f'{self_us / 1000:>10.1f} {cumulative_us / 1000:>11.1f}  '
+                f'{module}')
+
+        imports_ms = sum(row[0] for row in rows) / 1000
+        self.stdout.write(
+            f'\nМодулей: {len(rows)}, импорт: {imports_ms:.1f} мс, '
+            f'старт процесса целиком: {wall_ms:.1f} мс')
+        budget = options['budget']
+        if budget is not None and wall_ms > budget:
+            raise CommandError(
+                f'Холодный старт {wall_ms:.1f} мс превышает бюджет '
+                f'{budget:.1f} мс')
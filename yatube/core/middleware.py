@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .db import SlowQueryLog, SlowQueryLogger
+
+
+class SlowQueryLogMiddleware:
+    """Логирует SQL-запросы дольше SLOW_QUERY_THRESHOLD_MS."""
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS)
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryLogger(self.log, request)):
+            return self.get_response(request)
@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import heapq
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import remember
+
+
+def cursor_values(row, fields):
+    return tuple(
+        row[field] if isinstance(row, dict) else getattr(row, field)
+        for field in fields
+    )
+
+
+def encode_cursor(row, fields):
+    """Курсор — позиция последней строки страницы по полям сортировки."""
+    payload = json.dumps([
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in cursor_values(row, fields)
+    ])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def cursor_field_value(value, field):
+    """Значение курсора для поля модели; ValueError, если тип не тот."""
+    if isinstance(field, models.DateTimeField):
+        value = parse_datetime(value) if isinstance(value, str) else None
+        if value is None or (settings.USE_TZ and timezone.is_naive(value)):
+            raise ValueError(value)
+        return value
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        if isinstance(value, bool) or not isinstance(value, int) \
+                or not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(value)
+        return value
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError(value)
+    return value
+
+
+def decode_cursor(cursor, fields, model):
+    """
+    Обратное к encode_cursor; ValueError для испорченного курсора, в том
+    числе со значениями не того типа, что поля model.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError(cursor)
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError(cursor)
+    try:
+        return [
+            cursor_field_value(value, model._meta.get_field(field))
+            for value, field in zip(values, fields)
+        ]
+    except ValueError:
+        raise ValueError(cursor)
+
+
+def keyset_filter(queryset, cursor, fields, descending):
+    """Строки строго после курсора в порядке полей сортировки."""
+    lookup = 'lt' if descending else 'gt'
+    if cursor:
+        values = decode_cursor(cursor, fields, queryset.model)
+        condition = Q()
+        for position in range(len(fields) - 1, -1, -1):
+            equal = {field: value for field, value in
+                     zip(fields[:position], values[:position])}
+            condition |= Q(
+                **equal, **{f'{fields[position]}__{lookup}': values[position]})
+        queryset = queryset.filter(condition)
+    prefix = '-' if descending else ''
+    return queryset.order_by(*(prefix + field for field in fields))
+
+
+def keyset_page(queryset, cursor, limit, fields=('pub_date', 'id'),
+                descending=True):
+    """
+    Страница по ключу (keyset): вместо OFFSET строки отбираются условием
+    "строго после курсора" по полям сортировки, что при подходящем индексе
+    даёт ограниченный проход по индексу на любой глубине ленты.
+    Возвращает (строки, курсор следующей страницы или None).
+    """
+    return merged_keyset_page((queryset,), cursor, limit, fields, descending)
+
+
+def merged_keyset_page(querysets, cursor, limit, fields=('pub_date', 'id'),
+                       descending=True):
+    """
+    Как keyset_page, но для объединения нескольких лент: из каждой
+    читается не больше limit + 1 строк после курсора, потоки сливаются
+    heapq.merge по полям сортировки. Последнее поле уникально, поэтому
+    строка из нескольких лент идёт подряд и остаётся одна.
+    """
+    streams = [
+        keyset_filter(queryset, cursor, fields, descending)[:limit + 1]
+        for queryset in querysets
+    ]
+    rows, last = [], None
+    for row in heapq.merge(*streams, reverse=descending,
+                           key=lambda row: cursor_values(row, fields)):
+        key = cursor_values(row, fields)
+        if key == last:
+            continue
+        rows.append(row)
+        last = key
+        if len(rows) > limit:
+            break
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], fields)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который не считает COUNT(*) на каждый запрос: число строк
+    кешируется по тексту SQL и поколению тегов, которые сбрасывают
+    сигналы записи, так что счётчик живёт до первого изменения данных.
+    Вместо всего page_range шаблону отдаётся окно вокруг текущей страницы.
+    """
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, tags=('posts',), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.tags = tags
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return super().count
+        sql, params = query.sql_with_params()
+        digest = hashlib.md5(f'{sql}:{params!r}'.encode()).hexdigest()
+        return remember(f'count:{digest}', self.object_list.count,
+                        settings.COUNT_CACHE_TIMEOUT, self.tags)
+
+    def get_elided_page_range(self, number=1, on_each_side=3, on_ends=2):
+        """
+        Номера страниц вокруг текущей и по краям, пропуски заменены на
+        ELLIPSIS. Повторяет одноимённый метод Paginator из Django 3.2.
+        """
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1, self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
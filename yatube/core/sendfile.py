@@ -0,0 +1,107 @@
+import mimetypes
+import os
+import re
+import stat as stat_mode
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Разбирает одиночный диапазон `bytes=a-b`; None, если он не задан
+    или составной, (start, end) включительно, либо ValueError."""
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            raise ValueError(header)
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_range(filename, start, length):
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def send_file(request, filename, internal_url):
+    """
+    Отдаёт файл, не читая его в память Python.
+    Если за приложением стоит прокси (MEDIA_ACCEL), передача файла
+    поручается ему через X-Accel-Redirect/X-Sendfile; иначе файл
+    отдаётся через FileResponse (wsgi.file_wrapper/sendfile) с поддержкой
+    Range, ETag и If-None-Match.
+    """
+    try:
+        stat = os.stat(filename)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not stat_mode.S_ISREG(stat.st_mode):
+        raise Http404
+    size = stat.st_size
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{size:x}')
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    content_type = (mimetypes.guess_type(filename)[0]
+                    or 'application/octet-stream')
+    accel = settings.MEDIA_ACCEL
+    if accel == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(internal_url)
+    elif accel == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = filename
+    else:
+        response = ranged_response(
+            request, filename, size, etag, content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def ranged_response(request, filename, size, etag, content_type):
+    header = request.META.get('HTTP_RANGE', '')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_range(filename, start, length), status=206,
+                content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = length
+            response['Accept-Ranges'] = 'bytes'
+            return response
+    response = FileResponse(open(filename, 'rb'))
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,108 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK_SIZE = 64 * 1024
+
+
+def scan(root):
+    """Индекс STATIC_ROOT: URL-путь -> (путь, размер, {кодировка: (путь,
+    размер)}). Строится один раз, дальше запросы не трогают диск."""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            url = os.path.relpath(path, root).replace(os.sep, '/')
+            files[url] = path
+    index = {}
+    for url, path in files.items():
+        if url.endswith(('.gz', '.br')) and url[:-3] in files:
+            continue
+        variants = {
+            encoding: (files[url + suffix],
+                       os.path.getsize(files[url + suffix]))
+            for encoding, suffix in ENCODINGS if url + suffix in files
+        }
+        index[url] = (path, os.path.getsize(path), variants)
+    return index
+
+
+class StaticFilesApp:
+    """
+    WSGI-обёртка, раздающая собранную статику до Django.
+    Хешированные файлы отдаются с immutable-кешированием и предсжатыми
+    копиями, для неизвестных путей — дешёвый 404 без рендеринга шаблона.
+    """
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = scan(self.root)
+        return self._index
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.plain(start_response, '405 Method Not Allowed',
+                              [('Allow', 'GET, HEAD')])
+        entry = self.index.get(path[len(self.prefix):])
+        if entry is None:
+            return self.plain(start_response, '404 Not Found',
+                              [('Cache-Control', REVALIDATE)])
+        return self.serve(environ, start_response, path, entry)
+
+    def serve(self, environ, start_response, url, entry):
+        filename, size, variants = entry
+        content_type, _ = mimetypes.guess_type(filename)
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control',
+             IMMUTABLE if HASHED_NAME.search(url) else REVALIDATE),
+        ]
+        if variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+            header = environ.get('HTTP_ACCEPT_ENCODING', '')
+            accepted = {
+                token.split(';')[0].strip() for token in header.split(',')}
+            for encoding, _ in ENCODINGS:
+                if encoding in variants and encoding in accepted:
+                    filename, size = variants[encoding]
+                    headers.append(('Content-Encoding', encoding))
+                    break
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(filename, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, CHUNK_SIZE)
+        return self.iter_file(file)
+
+    @staticmethod
+    def iter_file(file):
+        with file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                yield chunk
+
+    @staticmethod
+    def plain(start_response, status, headers):
+        body = status.encode()
+        start_response(status, headers + [
+            ('Content-Type', 'text/plain; charset=utf-8'),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
@@ -0,0 +1,45 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml',
+                '.html', '.map')
+
+
+def compressors():
+    yield 'gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br', brotli.compress
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хеширует имена файлов через манифест и кладёт рядом с каждым
+    текстовым файлом сжатые копии `.gz` и (если установлен brotli) `.br`.
+    """
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get('dry_run'):
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE):
+                yield from self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            compressed_name = f'{name}.{suffix}'
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield name, compressed_name, True
@@ -0,0 +1,79 @@
+import hashlib
+import logging
+
+from django import template
+from django.conf import settings
+from django.core.cache.utils import make_template_fragment_key
+from sorl.thumbnail import get_thumbnail
+
+from core.cache import remember
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, timeout, name, vary_on, tags):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.vary_on = vary_on
+        self.tags = tags
+
+    def render(self, context):
+        tags = self.tags.resolve(context) if self.tags else ()
+        if isinstance(tags, str):
+            tags = tags.split()
+        key = make_template_fragment_key(
+            self.name, [var.resolve(context) for var in self.vary_on])
+        return remember(key, lambda: self.nodelist.render(context),
+                        int(self.timeout.resolve(context)), tuple(tags))
+
+
+@register.tag
+def fragment(parser, token):
+    """
+    Как {% cache %}, но с защитой от лавины пересчёта и сбросом по тегам:
+
+        {% fragment 60 'index_page' page_obj.number tags='posts' %}
+        ...
+        {% endfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments.")
+    tags = None
+    if bits[-1].startswith('tags='):
+        tags = parser.compile_filter(bits.pop()[len('tags='):])
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2].strip('\'"'),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+        tags,
+    )
+
+
+@register.simple_tag
+def thumbnail_url(image, geometry, **options):
+    """
+    Адрес миниатюры sorl-thumbnail. Поиск в хранилище ключей и генерация
+    миниатюры выполняются одним процессом, остальные получают адрес из
+    кеша.
+    """
+    if not image:
+        return ''
+    name = f'{image.name}:{geometry}:{sorted(options.items())}'
+    key = f'thumbnail:{hashlib.md5(name.encode()).hexdigest()}'
+
+    def lookup():
+        try:
+            return get_thumbnail(image, geometry, **options).url
+        except Exception:
+            logger.exception('Thumbnail for %s failed', image.name)
+            return ''
+
+    return remember(key, lookup, settings.THUMBNAIL_URL_CACHE_TIMEOUT)
@@ -0,0 +1,13 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def page_window(page_obj, on_each_side=3):
+    """Окно номеров страниц вокруг page_obj для шаблона пагинатора."""
+    paginator = page_obj.paginator
+    if hasattr(paginator, 'get_elided_page_range'):
+        return paginator.get_elided_page_range(
+            page_obj.number, on_each_side=on_each_side)
+    return paginator.page_range
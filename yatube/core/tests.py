@@ -1,8 +1,397 @@
-from django.test import TestCase
+import os
+import pickle
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post
+from .cache import (get_cached_object, invalidate_tags, object_key,
+                    remember, tags_version)
+from .db import fingerprint
+from .hll import HyperLogLog
+from .management.commands.startup_profile import parse_importtime
+from .pagination import CachedCountPaginator
+from .static import StaticFilesApp
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_error_page(self):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class SlowQueryLogTest(TestCase):
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s)\n"
+                        "  LIMIT 21"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?'
+        )
+
+    @override_settings(SLOW_QUERY_LOG=True, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_query_logged_once_with_plan(self):
+        Post.objects.create(
+            text='Тестовый текст',
+            author=User.objects.create_user(username='TestAuthor'))
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.client.get('/')
+            self.client.get('/')
+        entries = [line for line in logs.output if 'view: ' in line]
+        self.assertTrue(entries)
+        self.assertIn('posts:index', entries[0])
+        self.assertIn('plan:', entries[0])
+        self.assertTrue(any('posts/index.html:' in line for line in entries))
+        digests = [line.split()[2] for line in entries]
+        self.assertEqual(len(digests), len(set(digests)))
+
+
+class StartupProfileTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Разбор вывода python -X importtime
+      2.Дочерний процесс стартует из BASE_DIR при любом текущем каталоге
+      3.Ошибка старта сообщается трейсбеком без строк import time
+    """
+    def run_profile(self):
+        call_command('startup_profile', limit=1, stdout=StringIO())
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     posts.models\n'
+            'import time:       300 |        420 |   posts\n'
+        )
+        self.assertEqual(parse_importtime(output), [
+            (120, 120, 'posts.models'),
+            (300, 420, 'posts'),
+        ])
+
+    def test_cwd(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory)
+        self.run_profile()
+
+    def test_error(self):
+        self.addCleanup(os.environ.__setitem__, 'DJANGO_SETTINGS_MODULE',
+                        os.environ['DJANGO_SETTINGS_MODULE'])
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'missing_settings'
+        with self.assertRaises(CommandError) as context:
+            self.run_profile()
+        message = str(context.exception)
+        self.assertIn('Traceback', message)
+        self.assertIn('missing_settings', message)
+        self.assertNotIn('import time:', message)
+
+
+class StaticFilesAppTest(SimpleTestCase):
+    """
+    Тесты внутри класса:
+      1.collectstatic хеширует имена и кладёт рядом .gz
+      2.Хешированный файл отдаётся сжатым и с immutable-кешированием
+      3.Несуществующий файл — 404 без рендеринга шаблона
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        storage = 'core.storage.CompressedManifestStaticFilesStorage'
+        with override_settings(STATIC_ROOT=self.root,
+                               STATICFILES_STORAGE=storage):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.hashed = staticfiles_storage.stored_name(
+                'css/bootstrap.min.css')
+        self.app = StaticFilesApp(self.fail, root=self.root,
+                                  prefix='/static/')
+
+    def request(self, path, **environ):
+        environ.update(PATH_INFO=path, REQUEST_METHOD='GET')
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_hashed_file_is_served_compressed(self):
+        self.assertRegex(self.hashed, r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        status, headers, body = self.request(
+            f'/static/{self.hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', headers['Cache-Control'])
+        self.assertEqual(int(headers['Content-Length']), len(body))
+
+    def test_missing_file_is_cheap_404(self):
+        status, headers, body = self.request('/static/css/missing.css')
+        self.assertEqual(status, '404 Not Found')
+        self.assertEqual(headers['Content-Type'], 'text/plain; charset=utf-8')
+
+
+class MediaViewTest(SimpleTestCase):
+    """
+    Тесты внутри класса:
+      1.Файл отдаётся потоком с ETag, повторный запрос — 304
+      2.Запрос Range получает 206 с нужным куском файла
+      3.При MEDIA_ACCEL=nginx файл отдаёт прокси
+      4.Выход за пределы MEDIA_ROOT — 404
+    """
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        os.makedirs(os.path.join(root, 'posts'))
+        with open(os.path.join(root, 'posts', 'cat.gif'), 'wb') as file:
+            file.write(b'0123456789')
+        media_root = override_settings(MEDIA_ROOT=root)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get('/media/posts/cat.gif')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        response = self.client.get('/media/posts/cat.gif',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get('/media/posts/cat.gif',
+                                   HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        response = self.client.get('/media/posts/cat.gif',
+                                   HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+
+    @override_settings(MEDIA_ACCEL='nginx')
+    def test_accel_redirect(self):
+        response = self.client.get('/media/posts/cat.gif')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/posts/cat.gif')
+        self.assertEqual(response.content, b'')
+
+    def test_outside_media_root(self):
+        response = self.client.get('/media/../settings.py')
+        self.assertEqual(response.status_code, 404)
+
+
+class CachedCountPaginatorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestAuthor')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.user)
+            for number in range(3)
+        )
+
+    def test_count_cached_until_write(self):
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), 2).count, 3)
+        Post.objects.create(text='Новый', author=self.user)
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 4)
+
+    def test_elided_page_range(self):
+        paginator = CachedCountPaginator(range(1000), 10)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, 2, '…', 47, 48, 49, 50, 51, 52, 53, '…', 99, 100])
+        self.assertEqual(list(paginator.get_elided_page_range(1)),
+                         [1, 2, 3, 4, '…', 99, 100])
+        self.assertEqual(
+            list(CachedCountPaginator(range(30), 10).get_elided_page_range()),
+            [1, 2, 3])
+
+    def test_template_renders_window(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.user)
+            for number in range(200)
+        )
+        response = self.client.get('/?page=10')
+        self.assertContains(response, '?page=21"')
+        self.assertNotContains(response, '?page=15"')
+        self.assertContains(response, '…')
+
+
+class ObjectCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(title='Группа', slug='group')
+
+    def test_lookup_cached_by_pk_and_slug(self):
+        self.assertEqual(get_cached_object(Group, slug='group'), self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_object(Group, slug='group'),
+                             self.group)
+            self.assertEqual(get_cached_object(Group, pk=self.group.pk),
+                             self.group)
+        self.assertIsNone(get_cached_object(Group, slug='missing'))
+
+    def test_write_invalidates(self):
+        get_cached_object(Group, slug='group')
+        self.group.title = 'Новое название'
+        self.group.slug = 'renamed'
+        self.group.save()
+        self.assertEqual(
+            get_cached_object(Group, pk=self.group.pk).title,
+            'Новое название')
+        self.assertIsNone(get_cached_object(Group, slug='group'))
+        self.assertEqual(get_cached_object(Group, slug='renamed'),
+                         self.group)
+        self.group.delete()
+        self.assertIsNone(get_cached_object(Group, slug='renamed'))
+
+    def test_user_fields_only(self):
+        user = User.objects.create_user(username='Cached', password='secret')
+        get_cached_object(User, username='Cached')
+        cached = cache.get(object_key(User, user.pk))
+        self.assertEqual(cached.username, 'Cached')
+        self.assertNotIn('password', cached.__dict__)
+        self.assertNotIn(b'pbkdf2', pickle.dumps(cached))
+
+
+class CacheTagsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestAuthor')
+        self.first = Group.objects.create(title='Первая', slug='first')
+        self.second = Group.objects.create(title='Вторая', slug='second')
+        self.post = Post.objects.create(
+            text='Тестовый текст', author=self.user, group=self.first)
+
+    def test_invalidate_changes_generation(self):
+        version = tags_version('a', 'b')
+        self.assertEqual(tags_version('b', 'a'), version)
+        invalidate_tags('b')
+        self.assertNotEqual(tags_version('a', 'b'), version)
+
+    def test_writes_invalidate_dependent_tags(self):
+        tags = ('posts', f'post:{self.post.pk}', f'user:{self.user.pk}',
+                f'group:{self.first.pk}', f'group:{self.second.pk}')
+        before = {tag: tags_version(tag) for tag in tags}
+        self.post.group = self.second
+        self.post.save()
+        after = {tag: tags_version(tag) for tag in tags}
+        for tag in tags:
+            with self.subTest(tag=tag):
+                self.assertNotEqual(before[tag], after[tag])
+        Comment.objects.create(post=self.post, author=self.user, text='К')
+        self.assertNotEqual(tags_version(f'post:{self.post.pk}'),
+                            after[f'post:{self.post.pk}'])
+        self.assertEqual(tags_version('posts'), after['posts'])
+
+
+class RememberTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def load(self):
+        self.calls += 1
+        return self.calls
+
+    def test_cached_until_tag_invalidated(self):
+        self.assertEqual(remember('key', self.load, 60, ('tag',)), 1)
+        self.assertEqual(remember('key', self.load, 60, ('tag',)), 1)
+        invalidate_tags('tag')
+        self.assertEqual(remember('key', self.load, 60, ('tag',)), 2)
+
+    def test_stale_value_served_while_locked(self):
+        remember('key', self.load, 60, ('tag',))
+        invalidate_tags('tag')
+        cache.add('key:lock', 1)
+        self.assertEqual(remember('key', self.load, 60, ('tag',)), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_early_refresh(self):
+        remember('key', self.load, 60)
+        value, delta, expires, version = cache.get('key')
+        cache.set('key', (value, 1, expires, version))
+        self.assertEqual(remember('key', self.load, 60, beta=0), 1)
+        self.assertEqual(remember('key', self.load, 60, beta=1e6), 2)
+
+    def test_fragment_invalidated_by_post(self):
+        user = User.objects.create_user(username='TestAuthor')
+        Post.objects.create(text='Первый пост', author=user)
+        self.assertContains(self.client.get('/'), 'Первый пост')
+        Post.objects.filter(text='Первый пост').update(
+            text='Изменён', excerpt='Изменён', updated=timezone.now())
+        self.assertContains(self.client.get('/'), 'Первый пост')
+        Post.objects.create(text='Второй пост', author=user)
+        response = self.client.get('/')
+        self.assertContains(response, 'Второй пост')
+        self.assertContains(response, 'Изменён')
+
+
+class NegativeCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_missing_objects_cached(self):
+        for url in ('/profile/ghost/', '/group/ghost/', '/posts/999/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertContains(response, url, status_code=404)
+
+    def test_created_object_clears_miss(self):
+        self.client.get('/profile/ghost/')
+        User.objects.create_user(username='ghost')
+        self.assertEqual(self.client.get('/profile/ghost/').status_code, 200)
+
+    def test_path_escaped(self):
+        response = self.client.get('/<script>/')
+        self.assertContains(response, '/&lt;script&gt;/', status_code=404)
+
+
+class HyperLogLogTest(SimpleTestCase):
+    """
+    Тесты внутри класса:
+      1.Оценка укладывается в погрешность, повторы не считаются
+      2.Объединение скетчей — оценка объединения множеств
+      3.Скетч переживает dumps/loads, повреждённый не читается
+    """
+    def sketch(self, values):
+        sketch = HyperLogLog()
+        for value in values:
+            sketch.add(str(value))
+        return sketch
+
+    def test_estimate(self):
+        self.assertAlmostEqual(self.sketch(range(100)).count(), 100, delta=2)
+        sketch = self.sketch(list(range(20000)) * 2)
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.05)
+
+    def test_merge(self):
+        first = self.sketch(range(0, 6000))
+        first.merge(self.sketch(range(4000, 10000)))
+        self.assertAlmostEqual(first.count(), 10000, delta=10000 * 0.05)
+        with self.assertRaises(ValueError):
+            first.merge(HyperLogLog(precision=10))
+
+    def test_dumps(self):
+        sketch = self.sketch(range(1000))
+        loaded = HyperLogLog.loads(sketch.dumps())
+        self.assertEqual(loaded.registers, sketch.registers)
+        self.assertLess(len(HyperLogLog().dumps()), 100)
+        with self.assertRaises(ValueError):
+            HyperLogLog.loads(b'\x0cbroken')
@@ -1,8 +1,33 @@
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponseNotFound
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils._os import safe_join
+
+from .cache import read_through
+from .sendfile import send_file
+
+
+PATH_PLACEHOLDER = '\x00path\x00'
 
 
 def page_not_found(request, exception):
-    return render(request, 'core/404.html', {'path': request.path}, status=404)
+    """
+    Анонимным посетителям (в основном это боты с несуществующими
+    адресами) отдаётся заранее отрисованная страница, в которую
+    подставляется адрес.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return render(request, 'core/404.html', {'path': request.path},
+                      status=404)
+    body = read_through('page_not_found', lambda: render_to_string(
+        'core/404.html', {'path': PATH_PLACEHOLDER}, request),
+        settings.NOT_FOUND_PAGE_TIMEOUT)
+    return HttpResponseNotFound(
+        body.replace(PATH_PLACEHOLDER, escape(request.path)))
 
 
 def server_error(request):
@@ -15,3 +40,12 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def media(request, path):
+    """Отдаёт файлы из MEDIA_ROOT через прокси или FileResponse."""
+    try:
+        filename = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    return send_file(request, filename, settings.MEDIA_ACCEL_PREFIX + path)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Group, Comment, Follow
+from .models import Post, Group, Comment, Follow, GroupFollow, DataExport
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -27,7 +27,20 @@ class FollowAdmin(admin.ModelAdmin):
     search_fields = ('user', 'author')
 
 
+class GroupFollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'group')
+    search_fields = ('user__username', 'group__slug')
+
+
+class DataExportAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'status', 'created', 'claimed',
+                    'finished',)
+    list_filter = ('status',)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(GroupFollow, GroupFollowAdmin)
+admin.site.register(DataExport, DataExportAdmin)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+
+from core.cache import tag_versions
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def card_tags(post):
+    tags = [f'user:{post.author_id}']
+    if post.group_id:
+        tags.append(f'group:{post.group_id}')
+    return tags
+
+
+def card_key(post, versions):
+    """
+    Ключ карточки: время изменения поста и поколения тегов автора и
+    группы, чтобы переименование меняло и карточки.
+    """
+    parts = ':'.join(str(versions[tag]) for tag in card_tags(post))
+    return f'card:{post.pk}:{post.updated.timestamp()}:{parts}'
+
+
+def render_cards(posts):
+    """
+    HTML карточек постов страницы. Карточка кешируется по id, времени
+    изменения поста и поколениям его автора и группы, поэтому общая для
+    всех лент; все карточки страницы читаются одним get_many, а для
+    отсутствующих автор и группа подгружаются двумя запросами на всю
+    страницу.
+    """
+    posts = list(posts)
+    versions = tag_versions(
+        tag for post in posts for tag in card_tags(post))
+    keys = [card_key(post, versions) for post in posts]
+    cards = cache.get_many(keys)
+    missing = [post for post, key in zip(posts, keys) if key not in cards]
+    if missing:
+        prefetch_related_objects(missing, 'author', 'group')
+        rendered = {
+            card_key(post, versions):
+                render_to_string(CARD_TEMPLATE, {'post': post})
+            for post in missing
+        }
+        cache.set_many(rendered, settings.CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [cards[key] for key in keys]
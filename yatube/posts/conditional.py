@@ -0,0 +1,125 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from core.cache import get_cached_object, tags_version
+from .follows import is_following, is_following_group
+from .models import Group, Post, RelatedPost
+
+User = get_user_model()
+
+
+def post_detail_state(request, post_id):
+    if get_cached_object(Post, pk=post_id) is None:
+        return None, None
+    author_posts = Post.objects.filter(
+        author=OuterRef('author')
+    ).order_by().values('author').annotate(count=Count('pk')).values('count')
+    row = Post.objects.filter(pk=post_id).values(
+        'updated', 'author_id', 'group_id'
+    ).annotate(
+        last_comment=Max('comments__created'),
+        comments_count=Count('comments'),
+        author_posts=Subquery(author_posts),
+    ).first()
+    if row is None:
+        return None, None
+    # Похожие посты пересчитываются пакетно и не меняют updated
+    row['related'] = list(RelatedPost.objects.filter(
+        post_id=post_id
+    ).order_by('-score').values_list(
+        'related_id', flat=True)[:settings.RELATED_POSTS])
+    return row, max(filter(None, (row['updated'], row['last_comment'])))
+
+
+def profile_state(request, username):
+    """
+    Состояние профиля. Поколение тега автора меняют его посты (в том числе
+    удаление самого нового) и переименование автора. Last-Modified по
+    max(updated) после удаления поста ушёл бы назад, поэтому его нет:
+    страницу проверяет только ETag.
+    """
+    author = get_cached_object(User, username=username)
+    if author is None:
+        return None, None
+    row = Post.objects.filter(author=author).aggregate(
+        last=Max('updated'), count=Count('pk'))
+    row['version'] = tags_version(f'user:{author.pk}')
+    if request.user.is_authenticated:
+        row['following'] = is_following(request.user, author.pk)
+    return row, None
+
+
+def group_posts_state(request, slug):
+    """Состояние группы: как у профиля, поколение тега группы."""
+    group = get_cached_object(Group, slug=slug)
+    if group is None:
+        return None, None
+    row = Post.objects.filter(group__slug=slug).aggregate(
+        last=Max('updated'), count=Count('pk'))
+    row['version'] = tags_version(f'group:{group.pk}')
+    if request.user.is_authenticated:
+        row['following'] = is_following_group(request.user, group.pk)
+    return row, None
+
+
+class PageValidators:
+    """ETag и Last-Modified по состоянию страницы из state_func."""
+    def __init__(self, state_func):
+        self.state_func = state_func
+
+    def state(self, request, *args, **kwargs):
+        if not hasattr(request, '_page_state'):
+            request._page_state = self.state_func(request, *args, **kwargs)
+        return request._page_state
+
+    def etag(self, request, *args, **kwargs):
+        values, _ = self.state(request, *args, **kwargs)
+        if values is None:
+            return None
+        key = repr((sorted(values.items()), request.user.pk))
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def last_modified(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return self.state(request, *args, **kwargs)[1]
+
+
+def patch_page_cache_headers(request, response):
+    """Анонимные страницы можно хранить в общих кешах, остальные — нет."""
+    if (request.user.is_authenticated
+            or request.META.get('CSRF_COOKIE_USED')):
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True,
+                            max_age=settings.PAGE_CACHE_MAX_AGE)
+    patch_vary_headers(response, ('Cookie',))
+
+
+def conditional_page(state_func):
+    """
+    Условный GET для страницы: валидаторы считаются одним лёгким запросом
+    из state_func, без основного запроса view. Для несуществующего
+    объекта state_func возвращает (None, None) по кешу отсутствия, и view
+    отвечает 404 без запросов к базе.
+    """
+    validators = PageValidators(state_func)
+
+    def decorator(view):
+        conditional_view = condition(
+            validators.etag, validators.last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                patch_page_cache_headers(request, response)
+            return response
+        return wrapper
+    return decorator
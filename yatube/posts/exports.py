@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Comment, DataExport, Post
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+POST_FIELDS = ('id', 'text', 'pub_date', 'updated', 'group__slug', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'text', 'created')
+
+
+def write_json(archive, name, rows):
+    """Пишет JSON-массив в архив построчно, не собирая его в памяти."""
+    with archive.open(name, 'w', force_zip64=True) as raw:
+        text = io.TextIOWrapper(raw, encoding='utf-8')
+        text.write('[')
+        for number, row in enumerate(rows):
+            text.write(',\n' if number else '\n')
+            json.dump(row, text, cls=DjangoJSONEncoder, ensure_ascii=False)
+        text.write('\n]\n')
+        text.flush()
+        text.detach()
+
+
+def write_csv(archive, name, header, rows):
+    with archive.open(name, 'w', force_zip64=True) as raw:
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(header)
+        writer.writerows(rows)
+        text.flush()
+        text.detach()
+
+
+def write_archive(path, user_id):
+    posts = Post.objects.filter(author_id=user_id).order_by('id')
+    comments = Comment.objects.filter(author_id=user_id).order_by('id')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        write_json(archive, 'posts.json',
+                   posts.values(*POST_FIELDS).iterator(CHUNK_SIZE))
+        write_csv(archive, 'comments.csv', COMMENT_FIELDS,
+                  comments.values_list(*COMMENT_FIELDS).iterator(CHUNK_SIZE))
+        images = posts.exclude(image='').values_list('image', flat=True)
+        for name in images.iterator(CHUNK_SIZE):
+            if default_storage.exists(name):
+                archive.write(default_storage.path(name), name,
+                              compress_type=zipfile.ZIP_STORED)
+
+
+def claimable(stale_before=None):
+    """
+    Выгрузки, которые можно забрать: в очереди, а если задан
+    stale_before — и брошенные, забранные раньше него.
+    """
+    condition = Q(status=DataExport.PENDING)
+    if stale_before is not None:
+        condition |= Q(status=DataExport.RUNNING) & (
+            Q(claimed__lt=stale_before) | Q(claimed__isnull=True))
+    return DataExport.objects.filter(condition)
+
+
+def build_export(export_id, stale_before=None):
+    """
+    Собирает архив выгрузки. Строки читаются `.iterator()` порциями, а
+    файлы пишутся в ZIP потоком, поэтому память не зависит от объёма
+    аккаунта. Выгрузку забирает только один исполнитель; результат
+    записывается, только если её не забрали заново.
+    """
+    claimed = timezone.now()
+    if not claimable(stale_before).filter(pk=export_id).update(
+            status=DataExport.RUNNING, claimed=claimed):
+        return
+    export = DataExport.objects.get(pk=export_id)
+    name = f'{export.user_id}-{export.pk}.zip'
+    path = os.path.join(settings.EXPORTS_ROOT, name)
+    part = f'{path}.{claimed.timestamp():.6f}.part'
+    try:
+        os.makedirs(settings.EXPORTS_ROOT, exist_ok=True)
+        write_archive(part, export.user_id)
+        os.replace(part, path)
+    except Exception:
+        logger.exception('Export %s failed', export_id)
+        status, archive = DataExport.FAILED, ''
+    else:
+        status, archive = DataExport.DONE, name
+    DataExport.objects.filter(pk=export_id, claimed=claimed).update(
+        status=status, archive=archive, finished=timezone.now())
+
+
+def run_in_background(export_id):
+    try:
+        build_export(export_id)
+    finally:
+        connections.close_all()
+
+
+def remove_old_exports(user):
+    """
+    Удаляет готовые и неудачные выгрузки пользователя, кроме последних
+    EXPORTS_KEEP, вместе с архивами.
+    """
+    finished = DataExport.objects.filter(
+        user=user, status__in=(DataExport.DONE, DataExport.FAILED)
+    ).order_by('-created', '-pk')
+    old = list(finished.values_list('pk', 'archive')[settings.EXPORTS_KEEP:])
+    for _, archive in old:
+        if archive:
+            try:
+                os.remove(os.path.join(settings.EXPORTS_ROOT, archive))
+            except FileNotFoundError:
+                pass
+    DataExport.objects.filter(pk__in=[pk for pk, _ in old]).delete()
+
+
+def schedule_export(user):
+    """
+    Создаёт выгрузку и запускает сборку в фоне после коммита. Пока
+    прежняя выгрузка в очереди или собирается, возвращается она: повторные
+    запросы не плодят потоков.
+    """
+    with transaction.atomic():
+        # Блокировка строки пользователя упорядочивает его запросы
+        User.objects.select_for_update().get(pk=user.pk)
+        active = DataExport.objects.filter(
+            user=user, status__in=(DataExport.PENDING, DataExport.RUNNING)
+        ).first()
+        if active is not None:
+            return active
+        remove_old_exports(user)
+        export = DataExport.objects.create(user=user)
+    transaction.on_commit(lambda: threading.Thread(
+        target=run_in_background, args=(export.pk,), daemon=True).start())
+    return export
@@ -0,0 +1,138 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+
+from core.cache import get_cached_object, remember
+from .models import Group, Post
+
+User = get_user_model()
+
+
+class LatestPostsFeed(Feed):
+    title = 'ArtCommunity: последние обновления'
+    link = reverse_lazy('posts:index')
+    description = 'Новые посты всех авторов'
+
+    def items(self):
+        return self.posts(None)[:settings.FEED_SIZE]
+
+    def posts(self, obj):
+        return Post.objects.select_related('author', 'group')
+
+    def item_title(self, item):
+        return Truncator(item.text).words(8)
+
+    def item_description(self, item):
+        return item.text_html
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'ArtCommunity: {group.title}'
+
+    def link(self, group):
+        return reverse('posts:group_posts', kwargs={'slug': group.slug})
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return self.posts(group).filter(group=group)[:settings.FEED_SIZE]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'ArtCommunity: {author.get_full_name() or author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', kwargs={'username': author.username})
+
+    def description(self, author):
+        return f'Посты автора {author.username}'
+
+    def items(self, author):
+        return self.posts(author).filter(author=author)[:settings.FEED_SIZE]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupPostsFeed.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorPostsFeed.description
+
+
+def feed_tags(slug=None, username=None):
+    """Теги кеша, которые сбрасывает сохранение поста этой ленты."""
+    if slug is not None:
+        group = get_cached_object(Group, slug=slug)
+        if group is None:
+            raise Http404
+        return [f'group:{group.pk}']
+    if username is not None:
+        author = get_cached_object(User, username=username)
+        if author is None:
+            raise Http404
+        return [f'user:{author.pk}']
+    return ['posts']
+
+
+def cached_feed(feed):
+    """
+    Кеширует готовый XML ленты до сброса её тегов (с защитой от лавины
+    пересчёта) и отвечает 304 на запросы с совпадающим ETag, не обращаясь
+    к базе.
+    """
+    @wraps(feed)
+    def view(request, **kwargs):
+        def render():
+            response = feed(request, **kwargs)
+            return response.content, response['Content-Type']
+
+        key = f'feed:{hashlib.md5(request.path.encode()).hexdigest()}'
+        content, content_type = remember(
+            key, render, settings.FEED_CACHE_TIMEOUT, feed_tags(**kwargs))
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        patch_cache_control(response, public=True,
+                            max_age=settings.PAGE_CACHE_MAX_AGE)
+        return response
+    return view
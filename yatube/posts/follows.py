@@ -0,0 +1,86 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import read_through
+from .models import Follow, FollowSuggestion, GroupFollow, Post
+
+
+def follows_key(user_id):
+    return f'follows:{user_id}'
+
+
+def followed_ids(user_id):
+    """
+    Отсортированный массив id авторов, на которых подписан пользователь.
+    Хранится в кеше компактно (8 байт на автора) и проверяется бинарным
+    поиском, так что проверка подписки на любое число авторов страницы —
+    один запрос к кешу.
+    """
+    def load():
+        ids = Follow.objects.filter(user_id=user_id).order_by(
+            'author_id').values_list('author_id', flat=True)
+        return array('q', ids)
+
+    return read_through(follows_key(user_id), load,
+                        settings.FOLLOW_CACHE_TIMEOUT)
+
+
+def contains(ids, author_id):
+    position = bisect_left(ids, author_id)
+    return position < len(ids) and ids[position] == author_id
+
+
+def is_following(user, author_id):
+    if not user.is_authenticated:
+        return False
+    return contains(followed_ids(user.pk), author_id)
+
+
+def is_following_group(user, group_id):
+    if not user.is_authenticated:
+        return False
+    return GroupFollow.objects.filter(user=user, group_id=group_id).exists()
+
+
+def subscription_feeds(user):
+    """
+    Ленты подписок пользователя: по одной на автора и на группу, с
+    фильтром по уже известным id без соединений с подписками. Каждая
+    читается по своему индексу (автор или группа, pub_date, id) с LIMIT,
+    а merged_keyset_page сливает их без повторов, так что страница
+    стоит одинаково при любой истории подписок.
+    """
+    groups = GroupFollow.objects.filter(user=user).values_list(
+        'group_id', flat=True)
+    return tuple(
+        [Post.objects.filter(author_id=pk) for pk in followed_ids(user.pk)]
+        + [Post.objects.filter(group_id=pk) for pk in groups]
+    )
+
+
+def forget_followed(user_id):
+    """
+    Сбрасывает массив подписок: он соберётся из базы при следующем
+    чтении. Правка массива на месте могла бы разойтись с базой при
+    одновременных подписках.
+    """
+    cache.delete(follows_key(user_id))
+
+
+def suggested_authors(user, limit=5):
+    """
+    Авторы из предложений build_follow_suggestions одним запросом; те, на
+    кого пользователь подписался после расчёта, отбрасываются по кешу.
+    """
+    if not user.is_authenticated:
+        return []
+    ids = followed_ids(user.pk)
+    suggestions = FollowSuggestion.objects.filter(
+        user=user).select_related('author')[:limit * 2]
+    return [
+        suggestion.author for suggestion in suggestions
+        if not contains(ids, suggestion.author_id)
+    ][:limit]
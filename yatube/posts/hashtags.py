@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import invalidate_object, invalidate_tags, remember
+from .models import PostTag, Tag
+from .rendering import HASHTAG
+
+CHUNK_SIZE = 2000
+
+
+def extract_tags(text):
+    return {name.lower() for name in HASHTAG.findall(text)}
+
+
+def tag_ids(names):
+    """id тегов по именам; недостающие создаются одним запросом."""
+    Tag.objects.bulk_create([Tag(name=name) for name in names],
+                            ignore_conflicts=True)
+    tags = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+    # Страница нового тега могла закешироваться как отсутствующая
+    for name, pk in tags.items():
+        invalidate_object(Tag(pk=pk, name=name))
+    return tags
+
+
+def sync_tags(post):
+    """Приводит строки PostTag поста к хештегам его текста."""
+    names = extract_tags(post.text)
+    current = dict(PostTag.objects.filter(post=post).values_list(
+        'tag__name', 'tag_id'))
+    removed = [pk for name, pk in current.items() if name not in names]
+    added = names - set(current)
+    if removed:
+        PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+    if added:
+        tags = tag_ids(added)
+        PostTag.objects.bulk_create(
+            [PostTag(post=post, tag_id=pk) for pk in tags.values()],
+            ignore_conflicts=True)
+        invalidate_tags(*(f'tag:{pk}' for pk in tags.values()))
+
+
+def index_posts(queryset):
+    """
+    Перестраивает хештеги постов пачками по CHUNK_SIZE: для пачки один
+    запрос за тегами, одно удаление и одна вставка. Возвращает число
+    связей пост-тег.
+    """
+    rows = queryset.order_by('id').values_list('id', 'text')
+    chunk, stored = [], 0
+    for row in rows.iterator(CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            stored += index_chunk(chunk)
+            chunk = []
+    if chunk:
+        stored += index_chunk(chunk)
+    return stored
+
+
+def index_chunk(rows):
+    names = {post_id: extract_tags(text) for post_id, text in rows}
+    tags = tag_ids(set().union(*names.values()))
+    objects = [
+        PostTag(post_id=post_id, tag_id=tags[name])
+        for post_id, post_names in names.items() for name in post_names
+    ]
+    with transaction.atomic():
+        PostTag.objects.filter(post_id__in=list(names)).delete()
+        PostTag.objects.bulk_create(objects, batch_size=1000)
+    invalidate_tags(*(f'tag:{pk}' for pk in tags.values()))
+    return len(objects)
+
+
+def tag_count(tag):
+    """Число постов тега; сбрасывается при изменении его связей."""
+    return remember(
+        f'tag:{tag.pk}:count',
+        PostTag.objects.filter(tag=tag).count,
+        settings.COUNT_CACHE_TIMEOUT, (f'tag:{tag.pk}',))
+
+
+def tag_page(tag, before, size):
+    """
+    Страница постов тега, новые первыми, с курсором по id поста вместо
+    OFFSET: глубокие страницы стоят столько же, сколько первая.
+    Возвращает посты и курсор следующей страницы (None на последней).
+    """
+    rows = PostTag.objects.filter(tag=tag)
+    if before is not None:
+        rows = rows.filter(post_id__lt=before)
+    posts = [
+        row.post for row in rows.select_related('post').order_by(
+            '-post_id')[:size + 1]
+    ]
+    if len(posts) > size:
+        return posts[:size], posts[size - 1].pk
+    return posts, None
+
+
+def parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
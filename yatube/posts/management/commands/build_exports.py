@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.exports import build_export, claimable
+
+
+class Command(BaseCommand):
+    help = ('Собирает выгрузки, оставшиеся в очереди или брошенные '
+            'на сборке (например, после рестарта)')
+
+    def handle(self, *args, **options):
+        stale_before = timezone.now() - timedelta(
+            seconds=settings.EXPORT_CLAIM_TIMEOUT)
+        exports = claimable(stale_before).values_list('pk', flat=True)
+        for export_id in list(exports):
+            build_export(export_id, stale_before)
+            self.stdout.write(f'Выгрузка {export_id} обработана')
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import FollowSuggestion
+from posts.suggestions import FollowGraph, store_suggestions
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает предложения подписок (друзья друзей) '
+            'по снимку графа подписок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Предложений на пользователя.')
+        parser.add_argument(
+            '--max-pairs', type=int, default=5000000,
+            help='Путей длины 2 на пачку: ограничивает память шага.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        graph = FollowGraph.load()
+        self.stdout.write(
+            f'Граф: {len(graph)} пользователей, {len(graph.indices)} '
+            f'подписок, {time.monotonic() - started:.1f} с')
+        if not len(graph):
+            FollowSuggestion.objects.all().delete()
+        stored = 0
+        for start, stop in graph.batches(options['max_pairs']):
+            users, candidates, scores = graph.suggest(
+                start, stop, options['limit'])
+            stored += store_suggestions(
+                graph, start, stop, users, candidates, scores)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'Пользователи {start}-{stop}: {stored}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено предложений: {stored}, '
+            f'{time.monotonic() - started:.1f} с'))
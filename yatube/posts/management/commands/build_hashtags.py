@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.hashtags import index_posts
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает индекс хештегов по текстам постов: для постов, '
+            'записанных в обход save(), например import_content.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=int, default=0,
+            help='Только посты с id больше этого.')
+
+    def handle(self, *args, **options):
+        stored = index_posts(Post.objects.filter(id__gt=options['since']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено связей пост-хештег: {stored}'))
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.related import build_related, update_related
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает похожие посты по TF-IDF близости текстов. '
+            'С --incremental добавляет только посты новее индекса.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Дописать новые посты в сохранённый индекс.')
+        parser.add_argument(
+            '--limit', type=int, default=settings.RELATED_POSTS,
+            help='Похожих постов на пост.')
+        parser.add_argument(
+            '--block-size', type=int, default=1000,
+            help='Постов на шаг: ограничивает память матрицы близости.')
+        parser.add_argument(
+            '--max-df', type=float, default=0.5,
+            help='Доля постов, выше которой слово не учитывается.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['incremental']:
+            try:
+                stored = update_related(
+                    options['limit'], options['block_size'])
+            except FileNotFoundError:
+                raise CommandError(
+                    'Индекс не найден, сначала запустите без --incremental')
+        else:
+            stored = build_related(
+                options['limit'], options['block_size'], options['max_df'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено похожих постов: {stored}, '
+            f'{time.monotonic() - started:.1f} с'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = ('Собирает sitemap.xml и файлы разделов (посты, профили, группы) '
+            'в SITEMAPS_ROOT.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Адрес сайта для ссылок (по умолчанию SITE_URL).')
+        parser.add_argument(
+            '--shard-size', type=int,
+            help='Адресов в одном файле (по умолчанию SITEMAP_SHARD_SIZE).')
+
+    def handle(self, *args, **options):
+        names = build_sitemaps(base_url=options['base_url'],
+                               shard_size=options['shard_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано файлов карты сайта: {len(names)}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import decay_trending
+
+
+class Command(BaseCommand):
+    help = 'Затухание популярности постов; запускается по cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1,
+            help='Сколько часов прошло с прошлого запуска.')
+
+    def handle(self, *args, **options):
+        updated, deleted = decay_trending(options['hours'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено: {updated}, удалено: {deleted}'))
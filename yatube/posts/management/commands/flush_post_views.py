@@ -0,0 +1,21 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.viewcounts import flush_views
+
+
+class Command(BaseCommand):
+    help = ('Переносит скетчи уникальных просмотров постов из кеша '
+            'в таблицу PostViews.')
+
+    def handle(self, *args, **options):
+        # Кеш команды не видит скетчи, слитые в кеш веб-процессов
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise CommandError(
+                'Нужен общий для процессов кеш: задайте CACHE_BACKEND '
+                'и CACHE_LOCATION')
+        flushed = flush_views()
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено просмотров постов: {flushed}'))
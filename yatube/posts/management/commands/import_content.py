@@ -0,0 +1,393 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import invalidate_object, invalidate_tags
+from posts.follows import forget_followed
+from posts.hashtags import index_posts
+from posts.models import Comment, Follow, Group, Post
+from posts.signals import comment_tags, follow_tags, post_tags
+
+User = get_user_model()
+
+# Порядок сброса буферов: строки ссылаются на уже вставленные.
+MODELS = ('group', 'post', 'comment', 'follow')
+
+# Теги кешей, которые сбрасывает запись строки (как в posts.signals)
+IMPORT_TAGS = {
+    Post: post_tags,
+    Comment: comment_tags,
+    Follow: follow_tags,
+}
+
+# Поля, по которым ignore_conflicts пропускает уже имеющиеся строки
+UNIQUE_FIELDS = {
+    Group: ('slug',),
+    Post: ('id',),
+    Comment: ('id',),
+    Follow: ('user_id', 'author_id'),
+}
+
+
+@contextmanager
+def original_dates():
+    """Отключает auto_now/auto_now_add, чтобы сохранить даты источника."""
+    fields = [
+        Post._meta.get_field('pub_date'),
+        Post._meta.get_field('updated'),
+        Comment._meta.get_field('created'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def copy_file(source, target):
+    """Копия появляется под именем целиком, недописанной её не увидят."""
+    shutil.copyfile(source, target + '.part')
+    os.replace(target + '.part', target)
+
+
+def parse_id(value):
+    """id из JSONL приходит числом, из CSV — строкой."""
+    if value in (None, ''):
+        return None
+    return int(value)
+
+
+def parse_date(value, default):
+    if not value:
+        return default
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Неверная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.utc)
+    return date
+
+
+class Resolver:
+    """Кеш соответствий username/slug -> id, дозапрашиваемый пачками."""
+    def __init__(self):
+        self.users = {}
+        self.groups = {}
+
+    def load_users(self, usernames):
+        missing = set(usernames) - set(self.users) - {None, ''}
+        if not missing:
+            return
+        self.users.update(User.objects.filter(
+            username__in=missing).values_list('username', 'id'))
+        new = missing - set(self.users)
+        if new:
+            User.objects.bulk_create(
+                [User(username=name, password=make_password(None))
+                 for name in new],
+                ignore_conflicts=True,
+            )
+            self.users.update(User.objects.filter(
+                username__in=new).values_list('username', 'id'))
+            # Профиль мог закешироваться как отсутствующий
+            for name in new:
+                invalidate_object(User(username=name))
+
+    def load_groups(self, slugs):
+        missing = set(slugs) - set(self.groups) - {None, ''}
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing).values_list('slug', 'id'))
+
+
+class Command(BaseCommand):
+    help = ('Пакетный импорт групп, постов, комментариев и подписок '
+            'из JSONL/CSV через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help='Файлы JSONL/CSV; "-" — стандартный ввод (JSONL).')
+        parser.add_argument(
+            '--model', choices=MODELS,
+            help='Тип строк CSV-файла (в JSONL задаётся полем "type").')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл прогресса: повторный запуск продолжит с него.')
+        parser.add_argument(
+            '--media-dir',
+            help='Каталог, относительно которого указаны картинки постов.')
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Потоков для копирования картинок.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.resolver = Resolver()
+        self.buffers = {model: [] for model in MODELS}
+        self.imported = 0
+        self.skipped = 0
+        self.missing_images = 0
+        self.checkpoint = self.load_checkpoint()
+        started = time.monotonic()
+        with ThreadPoolExecutor(options['workers']) as self.pool, \
+                original_dates():
+            for path in options['paths']:
+                self.import_file(path)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано строк: {self.imported}, пропущено: '
+            f'{self.skipped}, нет файлов картинок: {self.missing_images}, '
+            f'{self.imported / elapsed:.0f} строк/с'))
+
+    def load_checkpoint(self):
+        path = self.options['checkpoint']
+        if path and os.path.exists(path):
+            with open(path) as file:
+                return json.load(file)
+        return {}
+
+    def save_checkpoint(self, path, line):
+        if not self.options['checkpoint'] or path == '-':
+            return
+        self.checkpoint[path] = line
+        with open(self.options['checkpoint'], 'w') as file:
+            json.dump(self.checkpoint, file)
+
+    def records(self, path):
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        else:
+            stream = open(path, encoding='utf-8', newline='')
+        with stream:
+            if path.endswith('.csv'):
+                if not self.options['model']:
+                    raise CommandError('Для CSV укажите --model')
+                for record in csv.DictReader(stream):
+                    yield dict(record, type=self.options['model'])
+            else:
+                for line in stream:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def import_file(self, path):
+        done = self.checkpoint.get(path, 0)
+        line = 0
+        for line, record in enumerate(self.records(path), start=1):
+            if line <= done:
+                continue
+            if record.get('type') not in self.buffers:
+                self.skipped += 1
+                continue
+            self.buffers[record['type']].append(record)
+            if line % self.options['batch_size'] == 0:
+                self.flush(path, line)
+        self.flush(path, line)
+
+    def flush(self, path, line):
+        """Вставляет накопленные строки одной транзакцией."""
+        started = time.monotonic()
+        records = self.buffers
+        self.buffers = {model: [] for model in MODELS}
+        self.resolver.load_users(
+            record.get(field) for model in ('post', 'comment', 'follow')
+            for record in records[model] for field in ('author', 'user'))
+        copies = {}
+        self.written = []
+        with transaction.atomic():
+            self.insert(Group, self.build_groups(records['group']))
+            self.resolver.load_groups(
+                record.get('group') for record in records['post'])
+            last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+            posts = self.insert(
+                Post, self.build_posts(records['post'], copies))
+            self.insert(Comment, self.build_comments(records['comment']))
+            self.insert(Follow, self.build_follows(records['follow']))
+        for copy in copies.values():
+            copy.result()
+        self.invalidate()
+        # Хештеги синхронизирует сигнал post_save, которого у bulk_create
+        # нет. Посты без id получают id больше прежнего максимума
+        if posts:
+            index_posts(Post.objects.filter(
+                Q(pk__in=[post.pk for post in posts if post.pk])
+                | Q(pk__gt=last_id)))
+        self.save_checkpoint(path, line)
+        if self.options['verbosity'] >= 2:
+            rows = sum(len(batch) for batch in records.values())
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'{path}:{line}: {rows} строк, {rows / elapsed:.0f} строк/с')
+
+    def insert(self, model, objects):
+        objects = self.new_objects(model, objects)
+        model.objects.bulk_create(
+            objects, batch_size=self.options['batch_size'],
+            ignore_conflicts=True)
+        self.imported += len(objects)
+        self.written.append((model, objects))
+        return objects
+
+    def invalidate(self):
+        """
+        bulk_create не шлёт сигналов: теги кешей лент и счётчиков, массивы
+        подписок, а для новых групп и кеш их отсутствия сбрасываются после
+        пачки.
+        """
+        tags = set()
+        for model, objects in self.written:
+            for obj in objects:
+                if model is Group:
+                    invalidate_object(obj)
+                    continue
+                tags.update(IMPORT_TAGS[model](obj))
+                if model is Follow:
+                    forget_followed(obj.user_id)
+        invalidate_tags(*tags)
+
+    def new_objects(self, model, objects):
+        """
+        Убирает строки, которые ignore_conflicts всё равно пропустил бы:
+        уже имеющиеся в базе и повторы внутри пачки. Они считаются
+        пропущенными, а не импортированными.
+        """
+        fields = UNIQUE_FIELDS[model]
+        keys = [tuple(getattr(obj, field) for field in fields)
+                for obj in objects]
+        known = [key for key in keys if None not in key]
+        seen = set()
+        if known:
+            seen.update(model.objects.filter(**{
+                f'{field}__in': {key[position] for key in known}
+                for position, field in enumerate(fields)
+            }).values_list(*fields))
+        new = []
+        for obj, key in zip(objects, keys):
+            if None not in key:
+                if key in seen:
+                    self.skipped += 1
+                    continue
+                seen.add(key)
+            new.append(obj)
+        return new
+
+    def build_groups(self, records):
+        return [
+            Group(slug=record['slug'], title=record.get('title', ''),
+                  description=record.get('description', ''))
+            for record in records
+        ]
+
+    def build_posts(self, records, copies):
+        posts = []
+        now = timezone.now()
+        images = self.image_names(records)
+        for record in records:
+            author_id = self.resolver.users.get(record.get('author'))
+            if author_id is None:
+                self.skipped += 1
+                continue
+            pub_date = parse_date(record.get('pub_date'), now)
+            post = Post(
+                id=parse_id(record.get('id')),
+                text=record.get('text', ''),
+                author_id=author_id,
+                group_id=self.resolver.groups.get(record.get('group')),
+                pub_date=pub_date,
+                updated=pub_date,
+                image=self.copy_image(record.get('image'), images, copies),
+            )
+            # bulk_create не вызывает save(), HTML собирается здесь
+            post.render()
+            posts.append(post)
+        return posts
+
+    def image_names(self, records):
+        """
+        Имена картинок в хранилище по хешу содержимого, посчитанному в пуле
+        потоков: одинаковые имена файлов из разных каталогов не затирают
+        друг друга, а повторный импорт не плодит копий. Файлов, которых
+        нет, в словаре нет.
+        """
+        sources = list({
+            record['image'] for record in records if record.get('image')})
+        names = dict(zip(sources, self.pool.map(self.image_name, sources)))
+        return {source: name for source, name in names.items() if name}
+
+    def image_name(self, source):
+        path = os.path.join(self.options['media_dir'] or '', source)
+        if not os.path.isfile(path):
+            return None
+        digest = hashlib.sha1()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        extension = os.path.splitext(source)[1].lower()
+        return f'posts/{digest.hexdigest()[:20]}{extension}'
+
+    def copy_image(self, source, images, copies):
+        """Ставит копирование картинки в пул потоков, возвращает имя."""
+        if not source:
+            return ''
+        name = images.get(source)
+        if name is None:
+            self.missing_images += 1
+            return ''
+        target = default_storage.path(name)
+        if name not in copies and not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            source = os.path.join(self.options['media_dir'] or '', source)
+            copies[name] = self.pool.submit(copy_file, source, target)
+        return name
+
+    def build_comments(self, records):
+        post_ids = set(Post.objects.filter(
+            pk__in={record.get('post') for record in records}
+        ).values_list('pk', flat=True))
+        comments = []
+        now = timezone.now()
+        for record in records:
+            author_id = self.resolver.users.get(record.get('author'))
+            post_id = parse_id(record.get('post'))
+            if author_id is None or post_id not in post_ids:
+                self.skipped += 1
+                continue
+            comments.append(Comment(
+                id=parse_id(record.get('id')),
+                post_id=post_id,
+                author_id=author_id,
+                text=record.get('text', ''),
+                created=parse_date(record.get('created'), now),
+            ))
+        return comments
+
+    def build_follows(self, records):
+        follows = []
+        for record in records:
+            user_id = self.resolver.users.get(record.get('user'))
+            author_id = self.resolver.users.get(record.get('author'))
+            if user_id is None or author_id is None or user_id == author_id:
+                self.skipped += 1
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+        return follows
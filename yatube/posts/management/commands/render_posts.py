@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from core.cache import object_key, tag_versions
+from posts.cards import card_key, card_tags
+from posts.models import Post
+
+CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = ('Заполняет HTML текста и начало текста постов, записанных до '
+            'их появления или в обход save().')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересобрать все посты, например после смены разметки.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only(
+            'id', 'text', 'updated', 'author_id', 'group_id').order_by('id')
+        if not options['all']:
+            posts = posts.filter(text_html='').exclude(text='')
+        chunk, rendered = [], 0
+        for post in posts.iterator(CHUNK_SIZE):
+            chunk.append(post)
+            if len(chunk) == CHUNK_SIZE:
+                rendered += self.render(chunk)
+                chunk = []
+        rendered += self.render(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено постов: {rendered}'))
+
+    def render(self, posts):
+        for post in posts:
+            post.render()
+        Post.objects.bulk_update(posts, ('text_html', 'excerpt'))
+        # Карточки и экземпляры в кеше собраны из прежних полей
+        versions = tag_versions(
+            tag for post in posts for tag in card_tags(post))
+        cache.delete_many(
+            [card_key(post, versions) for post in posts]
+            + [object_key(Post, post.pk) for post in posts])
+        return len(posts)
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_post_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Собирается'), ('done', 'Готов'), ('failed', 'Ошибка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата запроса')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата готовности')),
+                ('archive', models.CharField(blank=True, help_text='Имя файла в EXPORTS_ROOT', max_length=255, verbose_name='Архив')),
+                ('user', models.ForeignKey(help_text='Чьи данные выгружаются', on_delete=django.db.models.deletion.CASCADE, related_name='exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
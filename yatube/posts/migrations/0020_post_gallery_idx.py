@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_text_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(_negated=True, image=''), fields=['-pub_date', '-id'], name='post_gallery_idx'),
+        ),
+    ]
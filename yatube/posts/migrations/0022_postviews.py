@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_groupfollow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViews',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_stats', serialize=False, to='posts.Post')),
+                ('sketch', models.BinaryField(verbose_name='Скетч просмотров')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Уникальные просмотры')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата сброса')),
+            ],
+        ),
+    ]
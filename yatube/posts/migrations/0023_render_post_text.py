@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:40
+
+import re
+from urllib.parse import quote
+
+from django.db import migrations
+from django.utils.html import escape
+from django.utils.text import Truncator
+
+CHUNK_SIZE = 1000
+
+# Копия posts.rendering на момент миграции: её результат не должен
+# зависеть от того, как разметка и адреса изменятся потом
+EXCERPT_WORDS = 30
+HASHTAG = r'(?<![\w&#])#(\w{1,100})(?!\w)'
+LINK = re.compile(
+    r'(?P<url>https?://(?:[^\s<&]|&amp;)*[^\s<&.,:;!?)\]])|' + HASHTAG)
+STRONG = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+EMPHASIS = re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])')
+PARAGRAPHS = re.compile(r'\n\s*\n')
+
+
+def link(match):
+    url = match.group('url')
+    if url:
+        return f'<a href="{url}" rel="nofollow noopener">{url}</a>'
+    name = match.group(2)
+    return f'<a href="/tags/{quote(name.lower())}/">#{name}</a>'
+
+
+def render_html(text):
+    text = text.replace('\r\n', '\n').strip()
+    if not text:
+        return ''
+    paragraphs = []
+    for paragraph in PARAGRAPHS.split(text):
+        html = escape(paragraph)
+        html = STRONG.sub(r'<strong>\1</strong>', html)
+        html = EMPHASIS.sub(r'<em>\1</em>', html)
+        html = LINK.sub(link, html)
+        paragraphs.append('<p>{}</p>'.format(html.replace('\n', '<br>')))
+    return '\n'.join(paragraphs)
+
+
+def render_excerpt(text):
+    return Truncator(' '.join(text.split())).words(EXCERPT_WORDS)
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(text_html='').exclude(text='').only(
+        'id', 'text')
+    chunk = []
+    for post in posts.order_by('id').iterator(CHUNK_SIZE):
+        post.text_html = render_html(post.text)
+        post.excerpt = render_excerpt(post.text)
+        chunk.append(post)
+        if len(chunk) == CHUNK_SIZE:
+            Post.objects.bulk_update(chunk, ('text_html', 'excerpt'))
+            chunk = []
+    Post.objects.bulk_update(chunk, ('text_html', 'excerpt'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_postviews'),
+    ]
+
+    operations = [
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_render_post_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataexport',
+            name='claimed',
+            field=models.DateTimeField(blank=True, help_text='Когда исполнитель забрал выгрузку', null=True, verbose_name='Дата начала сборки'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth import get_user_model
 
+from .rendering import render_excerpt, render_html
+
 
 User = get_user_model()
 
@@ -39,6 +42,11 @@ class Post(models.Model):
         auto_now_add=True,
         help_text='Дата публикации'
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        help_text='Дата последнего изменения'
+    )
     group = models.ForeignKey(
         Group,
         verbose_name='Поле группы',
@@ -54,15 +62,53 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    text_html = models.TextField(
+        'HTML текста',
+        blank=True,
+        editable=False,
+        help_text='Текст с разметкой и ссылками, собирается при сохранении'
+    )
+    excerpt = models.TextField(
+        'Начало текста',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для лент, собирается при сохранении'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_pub_date_id_idx'),
+            # Ленты автора и группы, в том числе слитая лента подписок
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_pub_date_idx'),
+            # Галерея: частичный индекс только по постам с картинкой.
+            # Галереи группы и автора читаются индексами их лент: SQLite
+            # не выбирает частичный индекс той же формы вместо полного
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_gallery_idx',
+                         condition=~Q(image='')),
+        )
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
 
     def __str__(self):
         return self.text[:15]
 
+    def render(self):
+        self.text_html = render_html(self.text)
+        self.excerpt = render_excerpt(self.text)
+
+    def save(self, *args, **kwargs):
+        self.render()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_html', 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -109,3 +155,211 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user.username} follows {self.author.username}'
+
+
+class GroupFollow(models.Model):
+    """Подписка на группу: её посты попадают в ленту подписок."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_follows',
+        help_text='Кто подписан')
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        help_text='На какую группу подписан')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'group'), name='unique_group_follow'),
+        )
+
+    def __str__(self):
+        return f'{self.user.username} follows {self.group.slug}'
+
+
+class DataExport(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Собирается'),
+        (DONE, 'Готов'),
+        (FAILED, 'Ошибка'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='exports',
+        help_text='Чьи данные выгружаются')
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING)
+    created = models.DateTimeField(
+        'Дата запроса',
+        auto_now_add=True)
+    claimed = models.DateTimeField(
+        'Дата начала сборки',
+        null=True,
+        blank=True,
+        help_text='Когда исполнитель забрал выгрузку')
+    finished = models.DateTimeField(
+        'Дата готовности',
+        null=True,
+        blank=True)
+    archive = models.CharField(
+        'Архив',
+        max_length=255,
+        blank=True,
+        help_text='Имя файла в EXPORTS_ROOT')
+
+    class Meta:
+        ordering = ('-created',)
+
+    def __str__(self):
+        return f'{self.user.username} export {self.pk}'
+
+
+class FollowSuggestion(models.Model):
+    """Предложение подписки, рассчитанное build_follow_suggestions."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        help_text='Кому предлагается')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='На кого подписаться')
+    score = models.PositiveIntegerField(
+        'Общие подписки',
+        help_text='Сколько авторов из подписок пользователя '
+                  'подписаны на этого автора')
+
+    class Meta:
+        ordering = ('-score', 'author')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_suggestion'),
+        )
+        indexes = (
+            models.Index(fields=('user', '-score'),
+                         name='suggestion_user_score_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.user.username} -> {self.author.username}'
+
+
+class TrendingScore(models.Model):
+    """
+    Популярность поста: растёт на единицу с каждым комментарием и
+    периодически затухает командой decay_trending.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending')
+    score = models.FloatField(
+        'Популярность',
+        default=0)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('-score',), name='trending_score_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.2f}'
+
+
+class RelatedPost(models.Model):
+    """Похожий пост, рассчитанный build_related по TF-IDF текста."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_posts')
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+')
+    score = models.FloatField('Косинусная близость')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'related'), name='unique_related_post'),
+        )
+        indexes = (
+            models.Index(fields=('post', '-score'),
+                         name='related_post_score_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} ~ {self.related_id}: {self.score:.2f}'
+
+
+class Tag(models.Model):
+    """Хештег из текста поста, в нижнем регистре."""
+    name = models.CharField(
+        'Хештег',
+        max_length=100,
+        unique=True)
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """
+    Обратный индекс хештегов: заполняется при сохранении поста, посты
+    тега читаются по индексу (tag, post) без просмотра таблицы постов.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags')
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('tag', 'post'), name='unique_post_tag'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} #{self.tag_id}'
+
+
+class PostViews(models.Model):
+    """
+    Уникальные просмотры поста: HyperLogLog-скетч и его оценка. Строки
+    пишет только flush_post_views, страница поста базу не трогает.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='view_stats')
+    sketch = models.BinaryField('Скетч просмотров')
+    count = models.PositiveIntegerField(
+        'Уникальные просмотры',
+        default=0)
+    updated = models.DateTimeField(
+        'Дата сброса',
+        auto_now=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.count}'
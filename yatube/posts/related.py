@@ -0,0 +1,219 @@
+import os
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Post, RelatedPost
+
+CHUNK_SIZE = 2000
+INDEX_NAME = 'index.npz'
+TOKEN = re.compile(r'\w{2,}')
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def count_terms(rows, vocabulary, grow):
+    """
+    Матрица числа вхождений слов (CSR) для строк (id, текст). Слова вне
+    словаря добавляются, если grow, иначе пропускаются. Счётчики копятся
+    в компактных array, а не в списках объектов Python.
+    """
+    ids, indptr, indices, counts = array('q'), array('q', [0]), \
+        array('i'), array('f')
+    for post_id, text in rows:
+        terms = Counter()
+        for token in tokenize(text):
+            term = vocabulary.get(token)
+            if term is None and grow:
+                term = vocabulary[token] = len(vocabulary)
+            if term is not None:
+                terms[term] += 1
+        ids.append(post_id)
+        indices.extend(terms.keys())
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(counts, np.float32), np.frombuffer(indices, np.int32),
+         np.frombuffer(indptr, np.int64)),
+        shape=(len(ids), len(vocabulary)))
+    return np.frombuffer(ids, np.int64), matrix
+
+
+class TextIndex:
+    """
+    L2-нормированные TF-IDF векторы постов: строка matrix[i] — пост
+    ids[i], ids по возрастанию. Словарь и idf хранятся вместе с матрицей,
+    чтобы новые посты векторизовались в том же пространстве без полного
+    пересчёта.
+    """
+    def __init__(self, vocabulary, idf, ids, matrix):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ids = ids
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, rows, max_df=0.5):
+        vocabulary = {}
+        ids, counts = count_terms(rows, vocabulary, grow=True)
+        total = len(ids)
+        df = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = np.log((1 + total) / (1 + df)) + 1
+        # Слишком частые слова не отличают посты, а матрицу близости
+        # делают почти плотной
+        idf[df > max_df * total] = 0
+        return cls(vocabulary, idf.astype(np.float32), ids,
+                   cls.weigh(counts, idf))
+
+    @staticmethod
+    def weigh(counts, idf):
+        matrix = counts.copy()
+        matrix.data = (1 + np.log(matrix.data)) * idf[matrix.indices]
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        norms = np.sqrt(np.bincount(rows, matrix.data ** 2,
+                                    minlength=matrix.shape[0]))
+        norms[norms == 0] = 1
+        matrix.data /= norms[rows]
+        matrix.eliminate_zeros()
+        return matrix.astype(np.float32)
+
+    def add(self, rows):
+        """Добавляет новые посты, не меняя словарь и idf."""
+        ids, counts = count_terms(rows, self.vocabulary, grow=False)
+        start = len(self.ids)
+        self.ids = np.concatenate((self.ids, ids))
+        self.matrix = sparse.vstack(
+            (self.matrix, self.weigh(counts, self.idf))).tocsr()
+        return start
+
+    def neighbours(self, start, stop, limit):
+        """
+        Ближайшие по косинусу посты для строк [start, stop): произведение
+        блока на всю матрицу разреженное, лучшие limit на строку выбираются
+        сортировкой, без циклов Python. Возвращает (строка, столбец,
+        близость).
+        """
+        similarity = (self.matrix[start:stop] @ self.matrix.T).tocoo()
+        rows = similarity.row + start
+        columns, scores = similarity.col, similarity.data
+        keep = (rows != columns) & (scores > 0)
+        rows, columns, scores = rows[keep], columns[keep], scores[keep]
+        order = np.lexsort((columns, -scores, rows))
+        rows, columns, scores = rows[order], columns[order], scores[order]
+        keep = np.arange(len(rows)) - np.searchsorted(rows, rows) < limit
+        return rows[keep], columns[keep], scores[keep]
+
+    def keep(self, ids):
+        """Убирает из индекса посты, которых нет среди ids (удалённые)."""
+        alive = np.isin(self.ids, ids)
+        if not alive.all():
+            self.ids = self.ids[alive]
+            self.matrix = self.matrix[alive]
+
+    def save(self, root):
+        """
+        Словарь, idf и матрица пишутся одним файлом .npz: временный файл
+        подменяет старый целиком, и они не расходятся при сбое записи.
+        """
+        os.makedirs(root, exist_ok=True)
+        path = os.path.join(root, INDEX_NAME)
+        words = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path + '.part', 'wb') as file:
+            np.savez(file, words=np.array(words, dtype=str),
+                     ids=self.ids, idf=self.idf,
+                     data=self.matrix.data, indices=self.matrix.indices,
+                     indptr=self.matrix.indptr,
+                     shape=np.array(self.matrix.shape))
+        os.replace(path + '.part', path)
+
+    @classmethod
+    def load(cls, root):
+        with np.load(os.path.join(root, INDEX_NAME)) as data:
+            vocabulary = {
+                word: term for term, word in enumerate(data['words'].tolist())
+            }
+            matrix = sparse.csr_matrix(
+                (data['data'], data['indices'], data['indptr']),
+                shape=tuple(data['shape']))
+            return cls(vocabulary, data['idf'], data['ids'], matrix)
+
+
+def post_rows(queryset):
+    return queryset.order_by('id').values_list('id', 'text').iterator(
+        CHUNK_SIZE)
+
+
+def existing_ids(ids, batch_size=500):
+    ids, found = sorted(ids), set()
+    for start in range(0, len(ids), batch_size):
+        found.update(Post.objects.filter(
+            pk__in=ids[start:start + batch_size]).values_list('pk', flat=True))
+    return found
+
+
+def store_related(index, start, stop, rows, columns, scores):
+    """
+    Заменяет похожие посты для постов строк [start, stop) индекса.
+    Посты, удалённые после чтения текстов, пропускаются.
+    """
+    ids = index.ids
+    pairs = list(zip(
+        ids[rows].tolist(), ids[columns].tolist(), scores.tolist()))
+    existing = existing_ids(
+        {post for post, _, _ in pairs} | {related for _, related, _ in pairs})
+    objects = [
+        RelatedPost(post_id=post, related_id=related, score=score)
+        for post, related, score in pairs
+        if post in existing and related in existing
+    ]
+    with transaction.atomic():
+        RelatedPost.objects.filter(
+            post_id__gte=int(ids[start]),
+            post_id__lte=int(ids[stop - 1])).delete()
+        RelatedPost.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
+
+
+def build_related(limit, block_size, max_df, root=None):
+    """Полный пересчёт: новый словарь, idf и соседи всех постов."""
+    root = root or settings.RELATED_ROOT
+    index = TextIndex.build(post_rows(Post.objects.all()), max_df)
+    stored = relate(index, 0, len(index.ids), limit, block_size)
+    index.save(root)
+    return stored
+
+
+def update_related(limit, block_size, root=None):
+    """
+    Инкрементальный путь: удалённые посты убираются из индекса, посты
+    новее него векторизуются прежними словарём и idf, получают соседей
+    среди всех постов и дописываются в индекс.
+    """
+    root = root or settings.RELATED_ROOT
+    index = TextIndex.load(root)
+    index.keep(np.fromiter(
+        Post.objects.values_list('id', flat=True).iterator(CHUNK_SIZE),
+        np.int64))
+    newer = Post.objects.all()
+    if len(index.ids):
+        newer = newer.filter(id__gt=int(index.ids[-1]))
+    start = index.add(post_rows(newer))
+    stored = relate(index, start, len(index.ids), limit, block_size)
+    index.save(root)
+    return stored
+
+
+def relate(index, start, stop, limit, block_size):
+    stored = 0
+    for block in range(start, stop, block_size):
+        end = min(block + block_size, stop)
+        stored += store_related(
+            index, block, end, *index.neighbours(block, end, limit))
+    return stored
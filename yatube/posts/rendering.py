@@ -0,0 +1,49 @@
+import re
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.text import Truncator
+
+# Не часть слова и не HTML-сущность вида &#39;
+HASHTAG = re.compile(r'(?<![\w&#])#(\w{1,100})(?!\w)')
+LINK = re.compile(
+    r'(?P<url>https?://(?:[^\s<&]|&amp;)*[^\s<&.,:;!?)\]])|'
+    + HASHTAG.pattern)
+STRONG = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+EMPHASIS = re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])')
+PARAGRAPHS = re.compile(r'\n\s*\n')
+
+
+def link(match):
+    url = match.group('url')
+    if url:
+        return f'<a href="{url}" rel="nofollow noopener">{url}</a>'
+    name = match.group(2)
+    href = reverse('posts:tag_posts', kwargs={'name': name.lower()})
+    return f'<a href="{href}">#{name}</a>'
+
+
+def render_html(text):
+    """
+    HTML текста поста: абзацы и переносы строк, **жирный**, *курсив*,
+    ссылки на адреса и страницы хештегов. Текст экранируется до разметки,
+    поэтому результат можно выводить без фильтров как безопасный.
+    """
+    text = text.replace('\r\n', '\n').strip()
+    if not text:
+        return ''
+    paragraphs = []
+    for paragraph in PARAGRAPHS.split(text):
+        html = escape(paragraph)
+        html = STRONG.sub(r'<strong>\1</strong>', html)
+        html = EMPHASIS.sub(r'<em>\1</em>', html)
+        html = LINK.sub(link, html)
+        paragraphs.append('<p>{}</p>'.format(html.replace('\n', '<br>')))
+    return '\n'.join(paragraphs)
+
+
+def render_excerpt(text):
+    """Начало текста без разметки для лент, заголовков и превью."""
+    return Truncator(' '.join(text.split())).words(
+        settings.POST_EXCERPT_WORDS)
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import cache_tags, invalidate_tags
+from .follows import forget_followed
+from .hashtags import sync_tags
+from .models import Comment, Follow, Group, GroupFollow, Post, PostTag
+from .trending import bump_trending
+
+User = get_user_model()
+
+# Теги кеша: 'posts' — любые списки постов, 'post:<id>' — пост и его
+# комментарии, 'user:<id>' — профиль, посты и подписки пользователя,
+# 'group:<id>' — группа и её посты, 'tag:<id>' — посты хештега.
+
+
+def post_tags(post):
+    tags = ['posts', f'post:{post.pk}', f'user:{post.author_id}']
+    if post.group_id:
+        tags.append(f'group:{post.group_id}')
+    return tags
+
+
+def comment_tags(comment):
+    return [f'post:{comment.post_id}', f'user:{comment.author_id}']
+
+
+def follow_tags(follow):
+    return [f'user:{follow.user_id}', f'user:{follow.author_id}']
+
+
+def group_follow_tags(group_follow):
+    return [f'user:{group_follow.user_id}']
+
+
+def group_tags(group):
+    return [f'group:{group.pk}']
+
+
+def user_tags(user):
+    return [f'user:{user.pk}']
+
+
+cache_tags(Post, post_tags, track_changes=True)
+cache_tags(Comment, comment_tags)
+cache_tags(Follow, follow_tags)
+cache_tags(GroupFollow, group_follow_tags)
+cache_tags(Group, group_tags)
+cache_tags(User, user_tags)
+
+
+@receiver(post_save, sender=Follow)
+def add_followed(sender, instance, created, **kwargs):
+    if created:
+        forget_followed(instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_followed(sender, instance, **kwargs):
+    forget_followed(instance.user_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_trending(sender, instance, created, **kwargs):
+    if created:
+        bump_trending(instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+def post_hashtags(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        sync_tags(instance)
+
+
+@receiver(post_delete, sender=PostTag)
+def remove_post_tag(sender, instance, **kwargs):
+    invalidate_tags(f'tag:{instance.tag_id}')
@@ -0,0 +1,116 @@
+import os
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.urls import reverse
+
+from .models import Group, Post
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+INDEX_NAME = 'sitemap.xml'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def post_urls():
+    rows = Post.objects.order_by('id').values_list('id', 'updated')
+    for post_id, updated in rows.iterator(CHUNK_SIZE):
+        location = reverse('posts:post_detail', kwargs={'post_id': post_id})
+        yield location, updated
+
+
+def profile_urls():
+    rows = User.objects.annotate(
+        lastmod=Max('posts__updated')
+    ).filter(lastmod__isnull=False).order_by('id').values_list(
+        'username', 'lastmod')
+    for username, lastmod in rows.iterator(CHUNK_SIZE):
+        yield reverse('posts:profile', kwargs={'username': username}), lastmod
+
+
+def group_urls():
+    rows = Group.objects.annotate(
+        lastmod=Max('posts__updated')
+    ).order_by('id').values_list('slug', 'lastmod')
+    for slug, lastmod in rows.iterator(CHUNK_SIZE):
+        yield reverse('posts:group_posts', kwargs={'slug': slug}), lastmod
+
+
+SECTIONS = (
+    ('posts', post_urls),
+    ('profiles', profile_urls),
+    ('groups', group_urls),
+)
+
+
+def entry(tag, location, lastmod):
+    lines = [f'<{tag}><loc>{escape(location)}</loc>']
+    if lastmod is not None:
+        lines.append(
+            f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod>')
+    lines.append(f'</{tag}>\n')
+    return ''.join(lines)
+
+
+def write_xml(path, root_tag, entries):
+    """
+    Пишет файл карты во временный и подменяет им старый, чтобы краулер
+    не получил недописанный файл. Возвращает число записей и самую
+    позднюю дату изменения среди них.
+    """
+    count, latest = 0, None
+    with open(path + '.part', 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<{root_tag} xmlns="{XMLNS}">\n')
+        for tag, location, lastmod in entries:
+            file.write(entry(tag, location, lastmod))
+            count += 1
+            if lastmod is not None and (latest is None or lastmod > latest):
+                latest = lastmod
+        file.write(f'</{root_tag}>\n')
+    if count or root_tag == 'sitemapindex':
+        os.replace(path + '.part', path)
+    else:
+        os.remove(path + '.part')
+    return count, latest
+
+
+def build_sitemaps(root=None, base_url=None, shard_size=None):
+    """
+    Собирает индекс и файлы карты сайта. Строки читаются `.iterator()`
+    и пишутся в файл сразу, поэтому память не зависит от числа постов;
+    раздел делится на файлы по shard_size адресов. Возвращает имена
+    записанных файлов, включая индекс.
+    """
+    root = root or settings.SITEMAPS_ROOT
+    base_url = (base_url or settings.SITE_URL).rstrip('/')
+    shard_size = shard_size or settings.SITEMAP_SHARD_SIZE
+    os.makedirs(root, exist_ok=True)
+    shards = []
+    for section, urls in SECTIONS:
+        urls = (('url', base_url + location, lastmod)
+                for location, lastmod in urls())
+        number = 1
+        while True:
+            name = f'sitemap-{section}-{number}.xml'
+            count, lastmod = write_xml(os.path.join(root, name), 'urlset',
+                                       islice(urls, shard_size))
+            if count:
+                shards.append((name, lastmod))
+            if count < shard_size:
+                break
+            number += 1
+    write_xml(os.path.join(root, INDEX_NAME), 'sitemapindex', (
+        ('sitemap', base_url + reverse(
+            'posts:sitemap_shard', kwargs={'name': name}), lastmod)
+        for name, lastmod in shards
+    ))
+    written = {name for name, _ in shards} | {INDEX_NAME}
+    for name in os.listdir(root):
+        if name.startswith('sitemap') and name not in written:
+            os.remove(os.path.join(root, name))
+    return sorted(written)
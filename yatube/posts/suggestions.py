@@ -0,0 +1,135 @@
+import numpy as np
+from django.db import transaction
+
+from .models import Follow, FollowSuggestion
+
+CHUNK_SIZE = 100000
+
+
+class FollowGraph:
+    """
+    Снимок таблицы Follow в виде CSR: подписки пользователя с плотным
+    номером i — это indices[indptr[i]:indptr[i + 1]]. id пользователей
+    заменены плотными номерами, ids[i] — обратное соответствие. На ребро
+    уходит 4 байта, так что десятки миллионов подписок занимают сотни
+    мегабайт, а не гигабайты объектов Python.
+    """
+    def __init__(self, ids, indptr, indices):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def load(cls):
+        total = Follow.objects.count()
+        users = np.empty(total, dtype=np.int64)
+        authors = np.empty(total, dtype=np.int64)
+        size = 0
+        rows = Follow.objects.values_list('user_id', 'author_id')
+        chunk = []
+        for row in rows.iterator(CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                size = cls.put(users, authors, size, chunk)
+                chunk = []
+        size = cls.put(users, authors, size, chunk)
+        users, authors = users[:size], authors[:size]
+        ids = np.union1d(users, authors)
+        sources = np.searchsorted(ids, users).astype(np.int32)
+        targets = np.searchsorted(ids, authors).astype(np.int32)
+        del users, authors
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(ids)), out=indptr[1:])
+        return cls(ids, indptr, targets[order])
+
+    @staticmethod
+    def put(users, authors, size, chunk):
+        # Между count() и чтением могли добавиться подписки
+        chunk = chunk[:len(users) - size]
+        if chunk:
+            pairs = np.array(chunk, dtype=np.int64)
+            users[size:size + len(pairs)] = pairs[:, 0]
+            authors[size:size + len(pairs)] = pairs[:, 1]
+        return size + len(chunk)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def degrees(self, nodes):
+        return self.indptr[nodes + 1] - self.indptr[nodes]
+
+    def expand(self, sources, nodes):
+        """Рёбра из nodes: (источник для каждого ребра, конец ребра)."""
+        lengths = self.degrees(nodes)
+        starts = np.repeat(self.indptr[nodes] - np.cumsum(lengths)
+                           + lengths, lengths)
+        positions = starts + np.arange(lengths.sum())
+        return np.repeat(sources, lengths), self.indices[positions]
+
+    def batches(self, max_pairs):
+        """
+        Диапазоны пользователей [start, stop), для которых число путей
+        длины 2 не больше max_pairs: это ограничивает память одного шага.
+        """
+        if not len(self):
+            return
+        paths = np.add.reduceat(
+            np.append(self.degrees(self.indices), 0), self.indptr[:-1])
+        paths[self.indptr[:-1] == self.indptr[1:]] = 0
+        cumulative = np.cumsum(paths)
+        start = 0
+        while start < len(self):
+            base = cumulative[start - 1] if start else 0
+            stop = int(np.searchsorted(cumulative, base + max_pairs, 'right'))
+            stop = max(stop, start + 1)
+            yield start, stop
+            start = stop
+
+    def suggest(self, start, stop, limit):
+        """
+        Друзья друзей для пользователей [start, stop): кандидат w для u
+        получает столько очков, сколько авторов из подписок u подписаны
+        на w. Сам u и те, на кого он уже подписан, исключаются. Возвращает
+        массивы (пользователь, автор, очки), не больше limit на
+        пользователя, по убыванию очков.
+        """
+        size = np.int64(len(self))
+        users = np.arange(start, stop)
+        users, middle = self.expand(users, users)
+        followed = users * size + middle
+        users, candidates = self.expand(users, middle)
+        pairs = users * size + candidates
+        pairs = pairs[(users != candidates) & ~np.isin(pairs, followed)]
+        pairs, scores = np.unique(pairs, return_counts=True)
+        users, candidates = pairs // size, pairs % size
+        order = np.lexsort((candidates, -scores, users))
+        users, candidates = users[order], candidates[order]
+        scores = scores[order]
+        first = np.searchsorted(users, users)
+        keep = np.arange(len(users)) - first < limit
+        return users[keep], candidates[keep], scores[keep]
+
+
+def store_suggestions(graph, start, stop, users, candidates, scores):
+    """
+    Заменяет одной транзакцией предложения пользователей, чьи id лежат
+    между id предыдущей и этой пачки. Выборка по диапазону, а не по
+    списку id, не упирается в лимит параметров запроса и захватывает
+    пользователей, выпавших из графа.
+    """
+    ids = graph.ids
+    objects = [
+        FollowSuggestion(user_id=user, author_id=author, score=score)
+        for user, author, score in zip(
+            ids[users].tolist(), ids[candidates].tolist(), scores.tolist())
+    ]
+    stale = FollowSuggestion.objects.all()
+    if start:
+        stale = stale.filter(user_id__gt=int(ids[start - 1]))
+    if stop < len(ids):
+        stale = stale.filter(user_id__lte=int(ids[stop - 1]))
+    with transaction.atomic():
+        stale.delete()
+        FollowSuggestion.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
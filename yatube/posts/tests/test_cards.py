@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from posts.cards import render_cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Карточки берутся из кеша без запросов автора и группы
+      2.Изменение поста обновляет его карточку
+      3.Переименование автора и группы обновляет карточки
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test-slug-group',
+        )
+        for number in range(3):
+            Post.objects.create(text=f'Пост {number}', author=cls.user,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_cached(self):
+        with self.assertNumQueries(3):
+            cards = render_cards(Post.objects.all())
+        self.assertEqual(len(cards), 3)
+        self.assertIn('Тестовый заголовок группы', cards[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(render_cards(Post.objects.all()), cards)
+
+    def test_edit_updates_card(self):
+        render_cards(Post.objects.all())
+        post = Post.objects.get(text='Пост 1')
+        post.text = 'Исправленный пост'
+        post.save()
+        cards = render_cards(Post.objects.filter(pk=post.pk))
+        self.assertIn('Исправленный пост', cards[0])
+
+    def test_rename_updates_cards(self):
+        render_cards(Post.objects.all())
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название группы'
+        group.save()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name, user.last_name = 'Лев', 'Толстой'
+        user.save()
+        for card in render_cards(Post.objects.all()):
+            self.assertIn('Новое название группы', card)
+            self.assertIn('Лев Толстой', card)
@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post, PostTag, Tag
+
+User = get_user_model()
+
+
+class ImportContentTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.JSONL с группами, постами, комментариями и подписками
+      2.Даты источника сохраняются, картинки копируются
+      3.Повторный запуск с checkpoint ничего не дублирует, а строки
+        с id не дублируются и без него и не считаются импортированными
+      4.Картинки с одинаковыми именами не затирают друг друга, посты
+        с отсутствующими файлами импортируются без картинки
+      5.Повторный импорт CSV не дублирует строки и не считает их
+      6.Импорт сбрасывает кеши страниц, в том числе кеш отсутствия
+      7.Хештеги импортированных постов попадают в индекс тегов
+    """
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        media = override_settings(
+            MEDIA_ROOT=os.path.join(self.directory, 'media'))
+        media.enable()
+        self.addCleanup(media.disable)
+        with open(os.path.join(self.directory, 'cat.gif'), 'wb') as file:
+            file.write(b'GIF89a')
+        records = [
+            {'type': 'group', 'slug': 'cats', 'title': 'Коты'},
+            {'type': 'post', 'id': 10, 'text': 'Первый', 'author': 'leo',
+             'group': 'cats', 'pub_date': '2015-05-01T10:00:00',
+             'image': 'cat.gif'},
+            {'type': 'post', 'id': 11, 'text': 'Второй', 'author': 'tom'},
+            {'type': 'comment', 'post': 10, 'author': 'tom', 'text': 'Ок',
+             'created': '2015-05-02T10:00:00'},
+            {'type': 'follow', 'user': 'tom', 'author': 'leo'},
+            {'type': 'unknown'},
+        ]
+        self.path = os.path.join(self.directory, 'content.jsonl')
+        self.write_records(records)
+        self.checkpoint = os.path.join(self.directory, 'checkpoint.json')
+
+    def write_records(self, records):
+        with open(self.path, 'w') as file:
+            file.writelines(json.dumps(record) + '\n' for record in records)
+
+    def run_import(self):
+        out = StringIO()
+        call_command(
+            'import_content', self.path, batch_size=2,
+            checkpoint=self.checkpoint, media_dir=self.directory,
+            stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        self.run_import()
+        post = Post.objects.get(pk=10)
+        self.assertEqual(post.author.username, 'leo')
+        self.assertEqual(post.group, Group.objects.get(slug='cats'))
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertTrue(os.path.exists(post.image.path))
+        self.assertEqual(Comment.objects.get().created.day, 2)
+        self.assertTrue(Follow.objects.filter(
+            user__username='tom', author__username='leo').exists())
+
+    def test_resume(self):
+        self.run_import()
+        with open(self.checkpoint) as file:
+            self.assertEqual(json.load(file), {self.path: 6})
+        self.run_import()
+        self.assertEqual(Comment.objects.count(), 1)
+        os.remove(self.checkpoint)
+        # Заново вставляется только комментарий без id
+        self.assertIn('Импортировано строк: 1,', self.run_import())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_images(self):
+        os.mkdir(os.path.join(self.directory, 'dogs'))
+        with open(os.path.join(self.directory, 'dogs', 'cat.gif'),
+                  'wb') as file:
+            file.write(b'GIF89a dog')
+        self.write_records([
+            {'type': 'post', 'id': 10, 'author': 'leo', 'image': 'cat.gif'},
+            {'type': 'post', 'id': 11, 'author': 'leo',
+             'image': 'dogs/cat.gif'},
+            {'type': 'post', 'id': 12, 'author': 'leo', 'image': 'cat.gif'},
+            {'type': 'post', 'id': 13, 'author': 'leo',
+             'image': 'missing.gif'},
+        ])
+        output = self.run_import()
+        self.assertIn('Импортировано строк: 4,', output)
+        self.assertIn('нет файлов картинок: 1', output)
+        posts = Post.objects.in_bulk()
+        with posts[10].image.open() as file:
+            self.assertEqual(file.read(), b'GIF89a')
+        with posts[11].image.open() as file:
+            self.assertEqual(file.read(), b'GIF89a dog')
+        self.assertEqual(posts[12].image.name, posts[10].image.name)
+        self.assertEqual(posts[13].image.name, '')
+
+    def test_csv_rerun(self):
+        path = os.path.join(self.directory, 'posts.csv')
+        with open(path, 'w') as file:
+            file.write('id,text,author\n10,Первый,leo\n11,Второй,tom\n')
+        outputs = []
+        for _ in range(2):
+            out = StringIO()
+            call_command('import_content', path, model='post', stdout=out)
+            outputs.append(out.getvalue())
+        self.assertIn('Импортировано строк: 2,', outputs[0])
+        self.assertIn('Импортировано строк: 0,', outputs[1])
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_invalidates_caches(self):
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'leo'}),
+            reverse('posts:group_posts', kwargs={'slug': 'cats'}),
+        )
+        for url in urls:
+            self.assertEqual(Client().get(url).status_code, 404)
+        index = Client().get(reverse('posts:index'))
+        self.assertEqual(index.context['page_obj'].paginator.count, 0)
+        self.run_import()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), 'Первый')
+        index = Client().get(reverse('posts:index'))
+        self.assertEqual(index.context['page_obj'].paginator.count, 2)
+
+    def test_hashtags(self):
+        self.write_records([
+            {'type': 'post', 'id': 10, 'text': 'Первый #Кот',
+             'author': 'leo'},
+            {'type': 'post', 'text': 'Без id #кот #пёс', 'author': 'tom'},
+        ])
+        self.run_import()
+        self.assertEqual(set(Tag.objects.values_list('name', flat=True)),
+                         {'кот', 'пёс'})
+        self.assertEqual(PostTag.objects.filter(tag__name='кот').count(), 2)
+        response = Client().get(
+            reverse('posts:tag_posts', kwargs={'name': 'кот'}))
+        self.assertContains(response, 'Без id')
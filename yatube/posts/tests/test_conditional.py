@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Повторный запрос с ETag получает 304
+      2.Новый комментарий меняет ETag страницы поста
+      3.Анонимный ответ можно хранить в общем кеше, авторизованный — нет
+      4.ETag зависит от пользователя
+      5.Удаление самого нового поста и переименование группы или автора
+        меняют ответ профиля и группы
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test-slug-group',
+            description='test-description'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый заголовок',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified(self):
+        urls = (
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:profile', kwargs={'username': 'TestAuthor'}),
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug-group'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_comment_changes_etag(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(post=self.post, author=self.user, text='Да')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_changes_etag(self):
+        url = reverse('posts:group_posts', kwargs={'slug': 'test-slug-group'})
+        etag = self.guest_client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache_headers(self):
+        url = reverse('posts:profile', kwargs={'username': 'TestAuthor'})
+        response = self.guest_client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        authorized = self.authorized_client.get(url)
+        self.assertIn('private', authorized['Cache-Control'])
+        self.assertNotEqual(response['ETag'], authorized['ETag'])
+
+    def test_delete_newest(self):
+        newest = Post.objects.create(text='Новый пост', author=self.user,
+                                     group=self.group)
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'TestAuthor'}),
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug-group'}),
+        )
+        etags = [self.guest_client.get(url)['ETag'] for url in urls]
+        Post.objects.filter(pk=newest.pk).delete()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=http_date())
+                self.assertContains(response, self.post.excerpt)
+                self.assertNotContains(response, 'Новый пост')
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_rename(self):
+        group_url = reverse('posts:group_posts',
+                            kwargs={'slug': 'test-slug-group'})
+        profile_url = reverse('posts:profile',
+                              kwargs={'username': 'TestAuthor'})
+        group_etag = self.guest_client.get(group_url)['ETag']
+        profile_etag = self.guest_client.get(profile_url)['ETag']
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Лев'
+        user.save()
+        response = self.guest_client.get(
+            group_url, HTTP_IF_NONE_MATCH=group_etag)
+        self.assertContains(response, 'Новое название')
+        response = self.guest_client.get(
+            profile_url, HTTP_IF_NONE_MATCH=profile_etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts.exports import build_export, schedule_export
+from posts.models import Comment, DataExport, Post
+
+User = get_user_model()
+
+TEMP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=f'{TEMP_ROOT}/media',
+                   EXPORTS_ROOT=f'{TEMP_ROOT}/exports')
+class DataExportTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Архив содержит посты, комментарии и картинки автора
+      2.Скачать архив может только владелец
+      3.build_exports забирает заново брошенные сборки, но не идущие
+      4.Повторный запрос возвращает выгрузку, которая ещё собирается
+      5.Новая выгрузка удаляет старые сверх EXPORTS_KEEP вместе с архивами
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.other = User.objects.create_user(username='Other')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.user,
+            image=SimpleUploadedFile('small.gif', b'GIF89a',
+                                     content_type='image/gif'),
+        )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+        Comment.objects.create(post=cls.post, author=cls.user, text='Мой')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_archive(self):
+        self.authorized_client.post(reverse('posts:export_list'))
+        export = DataExport.objects.get(user=self.user)
+        build_export(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, DataExport.DONE)
+
+        response = self.authorized_client.get(
+            reverse('posts:export_download',
+                    kwargs={'export_id': export.pk}))
+        self.assertIn('attachment', response['Content-Disposition'])
+        path = f'{TEMP_ROOT}/exports/{export.archive}'
+        with zipfile.ZipFile(path) as archive:
+            posts = json.loads(archive.read('posts.json'))
+            comments = archive.read('comments.csv').decode()
+            self.assertEqual([post['text'] for post in posts],
+                             ['Тестовый текст'])
+            self.assertIn('Мой', comments)
+            self.assertEqual(archive.read(self.post.image.name), b'GIF89a')
+
+    def test_download_only_by_owner(self):
+        export = DataExport.objects.create(user=self.user)
+        build_export(export.pk)
+        other_client = Client()
+        other_client.force_login(self.other)
+        response = other_client.get(
+            reverse('posts:export_download',
+                    kwargs={'export_id': export.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_reclaim_stale(self):
+        timeout = timedelta(seconds=settings.EXPORT_CLAIM_TIMEOUT)
+        stale = DataExport.objects.create(
+            user=self.user, status=DataExport.RUNNING,
+            claimed=timezone.now() - timeout * 2)
+        running = DataExport.objects.create(
+            user=self.user, status=DataExport.RUNNING,
+            claimed=timezone.now())
+        call_command('build_exports', stdout=StringIO())
+        build_export(running.pk)
+        stale.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stale.status, DataExport.DONE)
+        self.assertEqual(running.status, DataExport.RUNNING)
+
+    def test_single_active_export(self):
+        for _ in range(3):
+            self.authorized_client.post(reverse('posts:export_list'))
+        self.assertEqual(DataExport.objects.filter(user=self.user).count(), 1)
+        export = DataExport.objects.get(user=self.user)
+        self.assertEqual(schedule_export(self.user), export)
+
+    def test_retention(self):
+        os.makedirs(f'{TEMP_ROOT}/exports', exist_ok=True)
+        old = []
+        for number in range(settings.EXPORTS_KEEP + 2):
+            name = f'old-{number}.zip'
+            with open(f'{TEMP_ROOT}/exports/{name}', 'wb') as file:
+                file.write(b'PK')
+            old.append(DataExport.objects.create(
+                user=self.user, status=DataExport.DONE, archive=name))
+        other = DataExport.objects.create(
+            user=self.other, status=DataExport.DONE)
+        new = schedule_export(self.user)
+        kept = old[-settings.EXPORTS_KEEP:]
+        self.assertEqual(
+            set(DataExport.objects.filter(user=self.user)),
+            {*kept, new})
+        self.assertTrue(DataExport.objects.filter(pk=other.pk).exists())
+        for export in old:
+            self.assertEqual(
+                os.path.exists(f'{TEMP_ROOT}/exports/{export.archive}'),
+                export in kept)
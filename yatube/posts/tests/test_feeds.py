@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedsTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.RSS и Atom лент сайта, группы и автора содержат посты
+      2.Повторный запрос ленты не обращается к базе, с ETag — 304
+      3.Новый пост в группе меняет её ленту
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test-slug-group',
+            description='test-description'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый заголовок',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_feeds(self):
+        urls = (
+            reverse('posts:index_rss'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_rss', kwargs={'slug': 'test-slug-group'}),
+            reverse('posts:group_atom', kwargs={'slug': 'test-slug-group'}),
+            reverse('posts:profile_rss', kwargs={'username': 'TestAuthor'}),
+            reverse('posts:profile_atom', kwargs={'username': 'TestAuthor'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Тестовый заголовок', response.content.decode())
+
+    def test_cached_and_not_modified(self):
+        url = reverse('posts:group_rss', kwargs={'slug': 'test-slug-group'})
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.guest_client.get(url)
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_post_invalidates_feed(self):
+        url = reverse('posts:group_rss', kwargs={'slug': 'test-slug-group'})
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(text='Свежий пост', author=self.user,
+                            group=self.group)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Свежий пост', response.content.decode())
@@ -0,0 +1,68 @@
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.follows import followed_ids, follows_key, is_following
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowSetTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Массив подписок отсортирован и читается из кеша
+      2.Подписка и отписка сбрасывают массив, он перечитывается из базы
+      3.Устаревший массив в кеше не мешает записи подписки
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.authors = [
+            User.objects.create_user(username=f'Author{number}')
+            for number in range(4)
+        ]
+        for author in reversed(cls.authors[:3]):
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_sorted_and_cached(self):
+        ids = followed_ids(self.user.pk)
+        self.assertEqual(list(ids),
+                         sorted(author.pk for author in self.authors[:3]))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.user, self.authors[0].pk))
+            self.assertFalse(is_following(self.user, self.authors[3].pk))
+
+    def test_follow_unfollow_reset_set(self):
+        followed_ids(self.user.pk)
+        new, old = self.authors[3], self.authors[0]
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': new.username}))
+        self.client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': old.username}))
+        self.assertIsNone(cache.get(follows_key(self.user.pk)))
+        self.assertTrue(is_following(self.user, new.pk))
+        self.assertFalse(is_following(self.user, old.pk))
+        self.assertFalse(
+            Follow.objects.filter(user=self.user, author=old).exists())
+
+    def test_stale_set(self):
+        new, old = self.authors[3], self.authors[0]
+        cache.set(follows_key(self.user.pk), array('q', [new.pk]))
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': new.username}))
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=new).exists())
+        cache.set(follows_key(self.user.pk), array('q'))
+        self.client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': old.username}))
+        self.assertFalse(
+            Follow.objects.filter(user=self.user, author=old).exists())
@@ -0,0 +1,115 @@
+import base64
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, GALLERY_PAGE_SIZE=2)
+class GalleryTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.В галерею попадают только посты с картинкой
+      2.Страницы листаются курсором без пропусков и повторов
+      3.Галереи группы и автора фильтруют посты
+      4.Галерея идёт по частичному индексу, галереи группы и автора —
+        по индексам их лент
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.other = User.objects.create_user(username='OtherAuthor')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug-group', description='Описание')
+        first = Post.objects.create(
+            text='Картинка 0', author=cls.user, group=cls.group,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'))
+        cls.images = [first] + [
+            Post.objects.create(text=f'Картинка {number}',
+                                author=cls.user, image=first.image.name)
+            for number in range(1, 4)
+        ]
+        cls.images.append(Post.objects.create(
+            text='Картинка 4', author=cls.other, group=cls.group,
+            image=first.image.name))
+        Post.objects.create(text='Без картинки', author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url):
+        posts, cursor = [], None
+        while True:
+            response = Client().get(url, {'cursor': cursor} if cursor else {})
+            self.assertLessEqual(len(response.context['posts']), 2)
+            posts.extend(response.context['posts'])
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                return posts
+
+    def test_pages(self):
+        self.assertEqual(self.walk(reverse('posts:gallery')),
+                         self.images[::-1])
+        response = Client().get(reverse('posts:gallery'),
+                                {'cursor': 'испорчен'})
+        self.assertEqual(response.context['posts'], self.images[:2:-1])
+        for values in (['abc', 1], [{'a': 1}, 1]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()).decode()
+            response = Client().get(reverse('posts:gallery'),
+                                    {'cursor': cursor})
+            self.assertEqual(response.context['posts'], self.images[:2:-1])
+
+    def test_group_and_author(self):
+        self.assertEqual(
+            self.walk(reverse('posts:group_gallery',
+                              kwargs={'slug': self.group.slug})),
+            [self.images[4], self.images[0]])
+        self.assertEqual(
+            self.walk(reverse('posts:profile_gallery',
+                              kwargs={'username': self.user.username})),
+            self.images[3::-1])
+
+    def test_partial_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('План запроса проверяется только для SQLite')
+        feeds = (
+            (Post.objects.all(), 'post_gallery_idx'),
+            (self.group.posts.all(), 'post_group_pub_date_idx'),
+            (self.user.posts.all(), 'post_author_pub_date_idx'),
+        )
+        for posts, index in feeds:
+            queryset = posts.exclude(image='').order_by('-pub_date', '-id')
+            sql, params = queryset[:3].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+            with self.subTest(index=index):
+                self.assertIn(index, plan)
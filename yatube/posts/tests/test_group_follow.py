@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from core.pagination import encode_cursor, keyset_filter
+from posts.follows import subscription_feeds
+from posts.models import Follow, Group, GroupFollow, Post
+
+User = get_user_model()
+
+
+class GroupFollowTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Подписка и отписка от группы
+      2.Лента подписок сливает посты авторов и групп без повторов
+      3.Курсор листает слитую ленту без пропусков
+      4.Каждая лента читается по индексу без сортировки во временном
+        B-дереве
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.stranger = User.objects.create_user(username='Stranger')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug-group', description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = []
+        for number in range(12):
+            cls.posts.append(Post.objects.create(
+                text=f'Пост {number}',
+                author=cls.author if number % 2 else cls.stranger,
+                group=cls.group if number % 3 == 0 else None))
+        Post.objects.create(text='Чужой пост', author=cls.stranger)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self):
+        posts, cursor = [], None
+        while True:
+            response = self.client.get(reverse('posts:follow_index'),
+                                       {'cursor': cursor} if cursor else {})
+            posts.extend(response.context['page_obj'].object_list)
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                return posts
+
+    def test_follow_group(self):
+        url = reverse('posts:group_posts', kwargs={'slug': self.group.slug})
+        self.assertFalse(self.client.get(url).context['following'])
+        self.client.get(reverse('posts:group_follow',
+                                kwargs={'slug': self.group.slug}))
+        self.client.get(reverse('posts:group_follow',
+                                kwargs={'slug': self.group.slug}))
+        self.assertEqual(GroupFollow.objects.count(), 1)
+        self.assertTrue(self.client.get(url).context['following'])
+        self.client.get(reverse('posts:group_unfollow',
+                                kwargs={'slug': self.group.slug}))
+        self.assertFalse(GroupFollow.objects.exists())
+
+    def test_merged_feed(self):
+        authors = [post for post in self.posts if post.author == self.author]
+        self.assertEqual(self.feed(), authors[::-1])
+        GroupFollow.objects.create(user=self.reader, group=self.group)
+        expected = [
+            post for post in self.posts
+            if post.author == self.author or post.group == self.group
+        ]
+        self.assertEqual(self.feed(), expected[::-1])
+
+    def test_api_merged_feed(self):
+        GroupFollow.objects.create(user=self.reader, group=self.group)
+        data = self.client.get(reverse('api:follow_index'),
+                               {'limit': 100}).json()
+        self.assertEqual(len(data['results']), 8)
+        self.assertIsNone(data['next'])
+
+    def test_index_plan(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('План запроса проверяется только для SQLite')
+        GroupFollow.objects.create(user=self.reader, group=self.group)
+        fields = ('pub_date', 'id')
+        cursor = encode_cursor(self.posts[6], fields)
+        feeds = subscription_feeds(self.reader)
+        self.assertEqual(len(feeds), 2)
+        for feed, index in zip(feeds, ('post_author_pub_date_idx',
+                                       'post_group_pub_date_idx')):
+            queryset = keyset_filter(feed, cursor, fields, True)[:11]
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(row) for row in db_cursor.fetchall())
+            with self.subTest(index=index):
+                self.assertIn(index, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
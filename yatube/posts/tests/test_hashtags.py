@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.hashtags import extract_tags, tag_count
+from posts.models import Post, PostTag, Tag
+from yatube.settings import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class HashtagTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Хештеги извлекаются из текста в нижнем регистре
+      2.Индекс обновляется при создании, правке и удалении поста
+      3.Страница тега листается курсором и не читает таблицу постов
+      4.Команда build_hashtags восстанавливает индекс
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+
+    def setUp(self):
+        cache.clear()
+
+    def tags(self, post):
+        return set(PostTag.objects.filter(post=post).values_list(
+            'tag__name', flat=True))
+
+    def test_extract(self):
+        self.assertEqual(
+            extract_tags('#Акварель и #пейзаж, a#b, &#39; #акварель'),
+            {'акварель', 'пейзаж'})
+
+    def test_sync_on_save(self):
+        post = Post.objects.create(text='#Акварель #пейзаж',
+                                   author=self.user)
+        self.assertEqual(self.tags(post), {'акварель', 'пейзаж'})
+        tag = Tag.objects.get(name='акварель')
+        self.assertEqual(tag_count(tag), 1)
+        post.text = '#пейзаж #портрет'
+        post.save()
+        self.assertEqual(self.tags(post), {'пейзаж', 'портрет'})
+        self.assertEqual(tag_count(tag), 0)
+        post.delete()
+        self.assertEqual(tag_count(Tag.objects.get(name='пейзаж')), 0)
+
+    def test_tag_page(self):
+        posts = [
+            Post.objects.create(text=f'#эскиз {number}', author=self.user)
+            for number in range(POSTS_PER_PAGE + 1)
+        ]
+        url = reverse('posts:tag_posts', kwargs={'name': 'Эскиз'})
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(url)
+        self.assertEqual(response.context['count'], POSTS_PER_PAGE + 1)
+        self.assertEqual(response.context['posts'], posts[:0:-1])
+        self.assertFalse(any(
+            'FROM "posts_post"' in query['sql'] for query in queries))
+        cursor = response.context['next_cursor']
+        response = Client().get(url, {'before': cursor})
+        self.assertEqual(response.context['posts'], [posts[0]])
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertEqual(Client().get(reverse(
+            'posts:tag_posts', kwargs={'name': 'нет'})).status_code, 404)
+
+    def test_build_command(self):
+        post = Post.objects.create(text='#графика', author=self.user)
+        PostTag.objects.all().delete()
+        call_command('build_hashtags', stdout=StringIO())
+        self.assertEqual(self.tags(post), {'графика'})
@@ -0,0 +1,114 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts import viewcounts
+from posts.models import Post, PostViews
+
+User = get_user_model()
+
+
+@override_settings(POST_VIEWS_MERGE_INTERVAL=0)
+class PostViewsTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Уникальные просмотры считаются без записи в базу
+      2.Просмотр учитывает некешируемый запрос, а не кешируемая страница
+      3.Буфер процесса откладывает слияние при занятой блокировке
+      4.flush_post_views сохраняет скетчи, после сброса кеша счёт
+        продолжается с сохранённого
+      5.flush_post_views отказывается работать с кешем процесса
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.readers = [
+            User.objects.create_user(username=f'Reader{number}')
+            for number in range(3)
+        ]
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.page_url = reverse('posts:post_detail',
+                               kwargs={'post_id': cls.post.pk})
+        cls.url = reverse('posts:post_view_beacon',
+                          kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        cache.clear()
+        viewcounts._buffer.clear()
+
+    def client_for(self, user=None):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def view(self, user=None):
+        return self.client_for(user).post(self.url)
+
+    def test_unique_views(self):
+        for user in self.readers + self.readers:
+            client = self.client_for(user)
+            with CaptureQueriesContext(connection) as queries:
+                client.post(self.url)
+            self.assertFalse([
+                query for query in queries
+                if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            ])
+        self.assertEqual(viewcounts.post_views(self.post.pk), 3)
+        # Просмотр учитывается до ответа со счётчиком
+        self.assertEqual(self.view().json(), {'views': 4})
+
+    def test_beacon_not_cached(self):
+        client = self.client_for(self.readers[0])
+        response = client.get(self.page_url)
+        self.assertEqual(viewcounts.post_views(self.post.pk), 0)
+        self.assertContains(response, self.url)
+        response = client.get(self.page_url,
+                              HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.view(self.readers[0])
+        self.assertIn('max-age=0', response['Cache-Control'])
+        self.assertEqual(response.json(), {'views': 1})
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_busy_lock(self):
+        cache.add(viewcounts.LOCK_KEY, 1)
+        self.view(self.readers[0])
+        self.assertIn(self.post.pk, viewcounts._buffer)
+        cache.delete(viewcounts.LOCK_KEY)
+        self.view(self.readers[1])
+        self.assertEqual(viewcounts.post_views(self.post.pk), 2)
+
+    def test_flush(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}
+        with override_settings(CACHES=shared):
+            self.check_flush()
+
+    def check_flush(self):
+        for user in self.readers:
+            self.view(user)
+        call_command('flush_post_views', stdout=StringIO())
+        self.assertEqual(PostViews.objects.get(post=self.post).count, 3)
+        cache.clear()
+        self.assertEqual(viewcounts.post_views(self.post.pk), 3)
+        self.view(self.author)
+        self.assertEqual(viewcounts.post_views(self.post.pk), 4)
+        call_command('flush_post_views', stdout=StringIO())
+        self.assertEqual(PostViews.objects.get(post=self.post).count, 4)
+
+    def test_flush_local_cache(self):
+        with self.assertRaises(CommandError):
+            call_command('flush_post_views', stdout=StringIO())
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post, RelatedPost
+
+User = get_user_model()
+
+TEMP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(RELATED_ROOT=TEMP_ROOT)
+class RelatedPostTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Похожие посты ранжируются по близости текстов, без самого поста
+      2.Блоки ограничивают память и дают тот же результат
+      3.Инкрементальный запуск добавляет только новые посты и не
+        ссылается на удалённые
+      4.Похожие посты показываются на странице поста
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.posts = [
+            Post.objects.create(text=text, author=cls.user)
+            for text in (
+                'Акварель по мокрому листу, пейзаж с рекой',
+                'Пейзаж акварелью: река и мокрый лист',
+                'Масляная живопись, портрет в мастерской',
+                'Портрет маслом при свете мастерской',
+            )
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def related(self, post):
+        return list(RelatedPost.objects.filter(post=post).order_by(
+            '-score').values_list('related_id', flat=True))
+
+    def build(self, **options):
+        call_command('build_related', max_df=1, stdout=StringIO(),
+                     **options)
+
+    def test_similar_texts(self):
+        self.build(limit=1)
+        first, second, third, fourth = self.posts
+        self.assertEqual(self.related(first), [second.pk])
+        self.assertEqual(self.related(second), [first.pk])
+        self.assertEqual(self.related(third), [fourth.pk])
+        self.assertEqual(self.related(fourth), [third.pk])
+
+    def test_blocks(self):
+        self.build(limit=1)
+        expected = list(RelatedPost.objects.values_list(
+            'post_id', 'related_id').order_by('post_id'))
+        self.build(limit=1, block_size=1)
+        self.assertEqual(list(RelatedPost.objects.values_list(
+            'post_id', 'related_id').order_by('post_id')), expected)
+
+    def test_incremental(self):
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+        with self.assertRaises(CommandError):
+            self.build(incremental=True)
+        self.build(limit=1)
+        count = RelatedPost.objects.count()
+        post = Post.objects.create(text='Портрет в мастерской',
+                                   author=self.user)
+        self.build(limit=1, incremental=True)
+        self.assertEqual(RelatedPost.objects.count(), count + 1)
+        self.assertIn(self.related(post)[0],
+                      (self.posts[2].pk, self.posts[3].pk))
+
+    def test_incremental_after_delete(self):
+        self.build(limit=1)
+        Post.objects.filter(pk=self.posts[3].pk).delete()
+        post = Post.objects.create(text='Портрет маслом при свете',
+                                   author=self.user)
+        self.build(limit=1, incremental=True)
+        self.assertEqual(self.related(post), [self.posts[2].pk])
+
+    def test_saved_as_one_file(self):
+        self.build(limit=1)
+        self.assertEqual(os.listdir(TEMP_ROOT), ['index.npz'])
+
+    def test_shown_on_post_page(self):
+        self.build(limit=1)
+        response = Client().get(reverse(
+            'posts:post_detail', kwargs={'post_id': self.posts[0].pk}))
+        self.assertEqual(response.context['related'], [self.posts[1]])
+        self.assertContains(response, 'Похожие посты')
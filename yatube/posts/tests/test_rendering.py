@@ -0,0 +1,89 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Post
+from posts.rendering import render_excerpt, render_html
+
+User = get_user_model()
+
+
+class RenderingTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Текст экранируется, разметка и ссылки собираются в HTML
+      2.HTML и начало текста сохраняются вместе с постом
+      3.Страница поста выводит HTML, карточки — начало текста
+      4.Команда render_posts и миграция заполняют старые посты
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_render_html(self):
+        tag_url = reverse('posts:tag_posts', kwargs={'name': 'эскиз'})
+        self.assertEqual(
+            render_html('<b>**Жирный** и *курсив*</b>\n'
+                        'https://example.com/?a=1&b=2. #Эскиз\n\nВторой'),
+            '<p>&lt;b&gt;<strong>Жирный</strong> и <em>курсив</em>'
+            '&lt;/b&gt;<br><a href="https://example.com/?a=1&amp;b=2" '
+            'rel="nofollow noopener">https://example.com/?a=1&amp;b=2</a>. '
+            f'<a href="{tag_url}">#Эскиз</a></p>\n<p>Второй</p>')
+        self.assertEqual(render_html('  \n'), '')
+
+    def test_excerpt(self):
+        with self.settings(POST_EXCERPT_WORDS=3):
+            self.assertEqual(render_excerpt('раз\nдва  три четыре'),
+                             'раз два три…')
+
+    def test_saved_with_post(self):
+        post = Post.objects.create(text='**Новый** пост', author=self.user)
+        self.assertEqual(post.text_html, '<p><strong>Новый</strong> пост</p>')
+        self.assertEqual(post.excerpt, '**Новый** пост')
+        post.text = 'Правка'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual((post.text_html, post.excerpt),
+                         ('<p>Правка</p>', 'Правка'))
+
+    def test_pages(self):
+        words = ' '.join(f'слово{number}' for number in range(50))
+        post = Post.objects.create(text=f'*{words}*', author=self.user)
+        response = Client().get(reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, f'<em>{words}</em>', html=True)
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, post.excerpt)
+        self.assertNotContains(response, 'слово49')
+
+    def test_backfill_command(self):
+        post = Post.objects.create(text='Старый пост', author=self.user)
+        Post.objects.filter(pk=post.pk).update(text_html='', excerpt='')
+        call_command('render_posts', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.text_html, post.excerpt),
+                         ('<p>Старый пост</p>', 'Старый пост'))
+
+    def test_backfill_migration(self):
+        migration = import_module('posts.migrations.0023_render_post_text')
+        text = '**Старый** пост #Кот\n\nhttps://example.com/?a=1&b=2'
+        post = Post.objects.create(text=text, author=self.user)
+        Post.objects.filter(pk=post.pk).update(text_html='', excerpt='')
+        migration.render_posts(apps, None)
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, (
+            '<p><strong>Старый</strong> пост <a '
+            'href="/tags/%D0%BA%D0%BE%D1%82/">#Кот</a></p>\n'
+            '<p><a href="https://example.com/?a=1&amp;b=2" '
+            'rel="nofollow noopener">https://example.com/?a=1&amp;b=2</a>'
+            '</p>'))
+        self.assertEqual(post.excerpt, ' '.join(text.split()))
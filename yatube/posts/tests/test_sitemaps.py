@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+TEMP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SITEMAPS_ROOT=TEMP_ROOT, SITE_URL='https://example.com')
+class SitemapTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Команда делит раздел на файлы по --shard-size и пишет индекс
+      2.Повторная сборка удаляет лишние файлы
+      3.Файлы отдаются по адресам /sitemap.xml и /sitemaps/<имя>
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        Group.objects.create(title='Группа', slug='test-slug-group')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user)
+            for number in range(5)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(TEMP_ROOT, name), encoding='utf-8') as file:
+            return file.read()
+
+    def test_shards(self):
+        call_command('build_sitemaps', shard_size=2, stdout=StringIO())
+        self.assertEqual(sorted(os.listdir(TEMP_ROOT)), [
+            'sitemap-groups-1.xml', 'sitemap-posts-1.xml',
+            'sitemap-posts-2.xml', 'sitemap-posts-3.xml',
+            'sitemap-profiles-1.xml', 'sitemap.xml',
+        ])
+        index = self.read('sitemap.xml')
+        self.assertIn(
+            '<loc>https://example.com/sitemaps/sitemap-posts-3.xml</loc>',
+            index)
+        posts = self.read('sitemap-posts-1.xml')
+        self.assertEqual(posts.count('<url>'), 2)
+        post = Post.objects.order_by('id').first()
+        self.assertIn(f'<loc>https://example.com/posts/{post.pk}/</loc>',
+                      posts)
+        self.assertIn('/profile/TestAuthor/',
+                      self.read('sitemap-profiles-1.xml'))
+
+    def test_stale_shards_removed(self):
+        call_command('build_sitemaps', shard_size=2, stdout=StringIO())
+        call_command('build_sitemaps', stdout=StringIO())
+        self.assertNotIn('sitemap-posts-2.xml', os.listdir(TEMP_ROOT))
+        self.assertEqual(self.read('sitemap-posts-1.xml').count('<url>'), 5)
+
+    def test_serve(self):
+        call_command('build_sitemaps', stdout=StringIO())
+        client = Client()
+        response = client.get(reverse('posts:sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'sitemapindex', b''.join(response.streaming_content))
+        response = client.get(reverse('posts:sitemap_shard',
+                                      kwargs={'name': 'sitemap-posts-1.xml'}))
+        self.assertEqual(response.status_code, 200)
+        response = client.get(reverse('posts:sitemap_shard',
+                                      kwargs={'name': 'settings.py'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Follow, FollowSuggestion
+from posts.suggestions import FollowGraph
+
+User = get_user_model()
+
+
+class FollowSuggestionTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Друзья друзей ранжируются по числу общих подписок
+      2.Пачки ограничены числом путей и дают тот же результат
+      3.Предложения показываются на странице подписок
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('ann', 'bob', 'cat', 'dan', 'eve')
+        }
+        edges = (('ann', 'bob'), ('ann', 'cat'), ('bob', 'dan'),
+                 ('cat', 'dan'), ('cat', 'eve'), ('bob', 'ann'),
+                 ('dan', 'ann'))
+        for user, author in edges:
+            Follow.objects.create(user=cls.users[user],
+                                  author=cls.users[author])
+
+    def setUp(self):
+        cache.clear()
+
+    def suggestions(self, name):
+        return list(FollowSuggestion.objects.filter(
+            user=self.users[name]).values_list('author__username', 'score'))
+
+    def test_friends_of_friends(self):
+        call_command('build_follow_suggestions', stdout=StringIO())
+        self.assertEqual(self.suggestions('ann'), [('dan', 2), ('eve', 1)])
+        self.assertEqual(self.suggestions('bob'), [('cat', 1)])
+        self.assertEqual(self.suggestions('dan'), [('bob', 1), ('cat', 1)])
+        self.assertEqual(self.suggestions('eve'), [])
+
+    def test_batches(self):
+        graph = FollowGraph.load()
+        batches = list(graph.batches(max_pairs=2))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(batches[0][0], 0)
+        self.assertEqual(batches[-1][1], len(graph))
+        call_command('build_follow_suggestions', max_pairs=1, limit=1,
+                     stdout=StringIO())
+        self.assertEqual(self.suggestions('ann'), [('dan', 2)])
+
+    def test_shown_on_follow_page(self):
+        call_command('build_follow_suggestions', stdout=StringIO())
+        client = Client()
+        client.force_login(self.users['ann'])
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [author.username for author in response.context['suggestions']],
+            ['dan', 'eve'])
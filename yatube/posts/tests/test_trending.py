@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post, TrendingScore
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=1, TRENDING_MIN_SCORE=0.3)
+class TrendingTest(TestCase):
+    """
+    Тесты внутри класса:
+      1.Комментарий увеличивает популярность поста
+      2.Затухание уменьшает очки и убирает остывшие посты
+      3.Вкладка "Популярное" показывает посты по убыванию очков
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestAuthor')
+        cls.hot = Post.objects.create(text='Горячий пост', author=cls.user)
+        cls.warm = Post.objects.create(text='Тёплый пост', author=cls.user)
+        Post.objects.create(text='Холодный пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        for post, count in ((self.hot, 3), (self.warm, 1)):
+            for number in range(count):
+                Comment.objects.create(post=post, author=self.user,
+                                       text=f'Комментарий {number}')
+
+    def test_comments_bump_score(self):
+        self.assertEqual(TrendingScore.objects.get(post=self.hot).score, 3)
+        self.assertEqual(TrendingScore.objects.get(post=self.warm).score, 1)
+
+    def test_decay(self):
+        call_command('decay_trending', hours=2, stdout=StringIO())
+        self.assertEqual(TrendingScore.objects.get(post=self.hot).score,
+                         0.75)
+        self.assertFalse(
+            TrendingScore.objects.filter(post=self.warm).exists())
+
+    def test_trending_page(self):
+        with self.assertNumQueries(1):
+            response = Client().get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'], [self.hot, self.warm])
+        self.assertNotContains(response, 'Холодный пост')
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import TrendingScore
+
+
+def bump_trending(post_id, amount=1):
+    """Увеличивает популярность поста одним UPDATE, без агрегации."""
+    updated = TrendingScore.objects.filter(post_id=post_id).update(
+        score=F('score') + amount)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            TrendingScore.objects.create(post_id=post_id, score=amount)
+    except IntegrityError:
+        TrendingScore.objects.filter(post_id=post_id).update(
+            score=F('score') + amount)
+
+
+def decay_trending(hours):
+    """
+    Умножает все очки на 2 ** (-hours / TRENDING_HALF_LIFE_HOURS) и
+    удаляет строки, опустившиеся ниже TRENDING_MIN_SCORE.
+    Возвращает (обновлено, удалено).
+    """
+    factor = 0.5 ** (hours / settings.TRENDING_HALF_LIFE_HOURS)
+    with transaction.atomic():
+        updated = TrendingScore.objects.update(score=F('score') * factor)
+        deleted, _ = TrendingScore.objects.filter(
+            score__lt=settings.TRENDING_MIN_SCORE).delete()
+    return updated, deleted
+
+
+def trending_posts(limit):
+    """Топ постов одним запросом по индексу на score."""
+    return [
+        row.post for row in TrendingScore.objects.select_related(
+            'post__author', 'post__group').order_by('-score')[:limit]
+    ]
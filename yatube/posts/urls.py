@@ -1,14 +1,27 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug:slug>/gallery/',
+         views.group_gallery, name='group_gallery'),
+    path('group/<slug:slug>/follow/',
+         views.group_follow, name='group_follow'),
+    path('group/<slug:slug>/unfollow/',
+         views.group_unfollow, name='group_unfollow'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending, name='trending'),
+    path('gallery/', views.gallery, name='gallery'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/gallery/',
+         views.profile_gallery, name='profile_gallery'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/view/', views.post_view_beacon,
+         name='post_view_beacon'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment', views.add_comment, name='add_comment'),
@@ -17,4 +30,21 @@ urlpatterns = [
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow, name='profile_unfollow'),
     path('posts/<int:post_id>/delete/', views.post_delete, name='post_delete'),
+    path('feeds/rss/', feeds.cached_feed(feeds.LatestPostsFeed()),
+         name='index_rss'),
+    path('feeds/atom/', feeds.cached_feed(feeds.LatestPostsAtomFeed()),
+         name='index_atom'),
+    path('group/<slug:slug>/rss/', feeds.cached_feed(feeds.GroupPostsFeed()),
+         name='group_rss'),
+    path('group/<slug:slug>/atom/',
+         feeds.cached_feed(feeds.GroupPostsAtomFeed()), name='group_atom'),
+    path('profile/<str:username>/rss/',
+         feeds.cached_feed(feeds.AuthorPostsFeed()), name='profile_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.cached_feed(feeds.AuthorPostsAtomFeed()), name='profile_atom'),
+    path('sitemap.xml', views.sitemap, name='sitemap'),
+    path('sitemaps/<str:name>', views.sitemap, name='sitemap_shard'),
+    path('export/', views.export_list, name='export_list'),
+    path('export/<int:export_id>/',
+         views.export_download, name='export_download'),
 ]
@@ -0,0 +1,152 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.hll import HyperLogLog
+from .models import Post, PostViews
+
+CHUNK_SIZE = 500
+LOCK_KEY = 'views:lock'
+DIRTY_KEY = 'views:dirty'
+
+# Буфер процесса: скетчи просмотров с момента последнего слияния в кеш
+_buffer = {}
+_buffer_lock = threading.Lock()
+_merged_at = time.monotonic()
+
+
+def sketch_key(post_id):
+    return f'views:sketch:{post_id}'
+
+
+def count_key(post_id):
+    return f'views:count:{post_id}'
+
+
+def visitor_id(request):
+    """Пользователь, а для анонимов — адрес и браузер; сессия не нужна."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return 'anon:{}:{}'.format(request.META.get('REMOTE_ADDR', ''),
+                               request.META.get('HTTP_USER_AGENT', ''))
+
+
+def record_view(request, post_id):
+    """
+    Учитывает просмотр в скетче процесса, без запросов к базе и кешу.
+    Раз в POST_VIEWS_MERGE_INTERVAL секунд буфер сливается в кеш.
+    Просмотры в буфере на момент остановки процесса теряются.
+    """
+    global _merged_at
+    with _buffer_lock:
+        sketch = _buffer.get(post_id)
+        if sketch is None:
+            sketch = _buffer[post_id] = HyperLogLog(
+                settings.POST_VIEWS_PRECISION)
+        sketch.add(visitor_id(request))
+        due = (time.monotonic() - _merged_at
+               >= settings.POST_VIEWS_MERGE_INTERVAL)
+        if due:
+            _merged_at = time.monotonic()
+    if due:
+        merge_buffer()
+
+
+def merge_buffer():
+    """
+    Объединяет скетчи процесса со скетчами в кеше. Слияние идёт под общей
+    блокировкой, чтобы процессы не затирали записи друг друга; если она
+    занята, буфер ждёт следующего раза. Скетча нет в кеше — основой
+    служит сохранённый в базе (только чтение).
+    """
+    with _buffer_lock:
+        sketches = dict(_buffer)
+        _buffer.clear()
+    if not sketches:
+        return
+    if not cache.add(LOCK_KEY, 1, settings.CACHE_LOCK_TIMEOUT):
+        restore(sketches)
+        return
+    try:
+        keys = {sketch_key(post_id): post_id for post_id in sketches}
+        stored = cache.get_many(keys)
+        saved = dict(PostViews.objects.filter(
+            post_id__in=[keys[key] for key in keys if key not in stored]
+        ).values_list('post_id', 'sketch'))
+        updates = {}
+        for key, post_id in keys.items():
+            sketch = sketches[post_id]
+            data = stored.get(key) or saved.get(post_id)
+            if data is not None:
+                sketch.merge(HyperLogLog.loads(bytes(data)))
+            updates[key] = sketch.dumps()
+            updates[count_key(post_id)] = sketch.count()
+        cache.set_many(updates, settings.POST_VIEWS_CACHE_TIMEOUT)
+        dirty = cache.get(DIRTY_KEY, set())
+        cache.set(DIRTY_KEY, dirty | set(sketches), None)
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def restore(sketches):
+    with _buffer_lock:
+        for post_id, sketch in sketches.items():
+            if post_id in _buffer:
+                sketch.merge(_buffer[post_id])
+            _buffer[post_id] = sketch
+
+
+def post_views(post_id):
+    """Оценка уникальных просмотров: из кеша, иначе из последнего сброса."""
+    count = cache.get(count_key(post_id))
+    if count is None:
+        count = PostViews.objects.filter(post_id=post_id).values_list(
+            'count', flat=True).first() or 0
+    return count
+
+
+def flush_views():
+    """
+    Переносит скетчи постов, просмотренных с прошлого сброса, из кеша в
+    таблицу PostViews пачками по CHUNK_SIZE. Скетч в кеше уже включает
+    сохранённый, поэтому строка просто заменяется. Возвращает число
+    сохранённых постов.
+    """
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while not cache.add(LOCK_KEY, 1, settings.CACHE_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return 0
+        time.sleep(0.05)
+    try:
+        dirty = sorted(cache.get(DIRTY_KEY, set()))
+        cache.delete(DIRTY_KEY)
+    finally:
+        cache.delete(LOCK_KEY)
+    flushed = 0
+    for start in range(0, len(dirty), CHUNK_SIZE):
+        flushed += flush_chunk(dirty[start:start + CHUNK_SIZE])
+    return flushed
+
+
+def flush_chunk(post_ids):
+    stored = cache.get_many([sketch_key(post_id) for post_id in post_ids])
+    existing = set(Post.objects.filter(
+        pk__in=post_ids).values_list('pk', flat=True))
+    saved = set(PostViews.objects.filter(
+        post_id__in=post_ids).values_list('post_id', flat=True))
+    rows, now = [], timezone.now()
+    for post_id in post_ids:
+        data = stored.get(sketch_key(post_id))
+        if data is None or post_id not in existing:
+            continue
+        rows.append(PostViews(post_id=post_id, sketch=data, updated=now,
+                              count=HyperLogLog.loads(data).count()))
+    PostViews.objects.bulk_create(
+        [row for row in rows if row.post_id not in saved])
+    PostViews.objects.bulk_update(
+        [row for row in rows if row.post_id in saved],
+        ('sketch', 'count', 'updated'))
+    return len(rows)
@@ -1,10 +1,30 @@
+import os
+
 from .forms import PostForm, CommentForm
+from django.conf import settings
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, Follow
+from .models import (DataExport, Post, Group, Follow, GroupFollow,
+                     RelatedPost, Tag)
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from yatube.settings import POSTS_PER_PAGE
+from core.cache import get_cached_object_or_404
+from core.pagination import CachedCountPaginator, merged_keyset_page
+from core.sendfile import send_file
+from .conditional import (conditional_page, group_posts_state,
+                          post_detail_state, profile_state)
+from .exports import schedule_export
+from .follows import (is_following, is_following_group,
+                      subscription_feeds, suggested_authors)
+from .hashtags import parse_cursor, tag_count, tag_page
+from .sitemaps import INDEX_NAME
+from .trending import trending_posts
+from .viewcounts import post_views, record_view
 
 
 User = get_user_model()
@@ -12,7 +32,7 @@ User = get_user_model()
 
 def index(request):
     post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
+    paginator = CachedCountPaginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -23,45 +43,104 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+def trending(request):
+    context = {
+        'posts': trending_posts(settings.TRENDING_SIZE),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@conditional_page(group_posts_state)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_cached_object_or_404(Group, slug=slug)
     posts = group.posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
+    paginator = CachedCountPaginator(posts, POSTS_PER_PAGE,
+                                     tags=(f'group:{group.pk}',))
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     context = {
         'group': group,
         'page_obj': page_obj,
+        'following': is_following_group(request.user, group.pk),
     }
 
     return render(request, 'posts/group_list.html', context)
 
 
+def cursor_page(request, querysets, limit):
+    """
+    Страница лент по курсору из ?cursor=; испорченный курсор открывает
+    первую страницу, как неверный номер у Paginator.get_page.
+    """
+    try:
+        return merged_keyset_page(
+            querysets, request.GET.get('cursor'), limit)
+    except ValueError:
+        return merged_keyset_page(querysets, None, limit)
+
+
+def gallery_page(request, posts, context):
+    """Сетка миниатюр постов с картинкой, курсор по (pub_date, id)."""
+    posts = posts.exclude(image='').select_related('author')
+    images, next_cursor = cursor_page(
+        request, (posts,), settings.GALLERY_PAGE_SIZE)
+    context.update(posts=images, next_cursor=next_cursor)
+    return render(request, 'posts/gallery.html', context)
+
+
+def gallery(request):
+    return gallery_page(request, Post.objects.all(), {})
+
+
+def group_gallery(request, slug):
+    group = get_cached_object_or_404(Group, slug=slug)
+    return gallery_page(request, group.posts.all(), {'group': group})
+
+
+def profile_gallery(request, username):
+    author = get_cached_object_or_404(User, username=username)
+    return gallery_page(request, author.posts.all(), {'author': author})
+
+
+def tag_posts(request, name):
+    tag = get_cached_object_or_404(Tag, name=name.lower())
+    before = parse_cursor(request.GET.get('before'))
+    posts, next_cursor = tag_page(tag, before, POSTS_PER_PAGE)
+    context = {
+        'tag': tag,
+        'posts': posts,
+        'count': tag_count(tag),
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/tag.html', context)
+
+
+@conditional_page(profile_state)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_cached_object_or_404(User, username=username)
     user_posts = user.posts.all()
-    paginator = Paginator(user_posts, POSTS_PER_PAGE)
+    paginator = CachedCountPaginator(user_posts, POSTS_PER_PAGE,
+                                     tags=(f'user:{user.pk}',))
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    posts_count = user_posts.count()
+    posts_count = paginator.count
 
-    following = Follow.objects.filter(
-        user=request.user.id,
-        author=user,
-    ).exists()
+    following = is_following(request.user, user.pk)
 
     context = {
         'author': user,
         'page_obj': page_obj,
         'posts_count': posts_count,
         'following': following,
+        'suggestions': suggested_authors(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@conditional_page(post_detail_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_cached_object_or_404(Post, pk=post_id)
     author_posts_count = post.author.posts.all().count()
     comments = post.comments.all()
     if post.author != request.user:
@@ -69,16 +148,33 @@ def post_detail(request, post_id):
     else:
         if_author = True
     form = CommentForm(request.POST or None)
+    related = RelatedPost.objects.filter(post_id=post.pk).select_related(
+        'related__author').order_by('-score')[:settings.RELATED_POSTS]
     context = {
         'post': post,
         'author_posts_count': author_posts_count,
         'comments': comments,
         'if_author': if_author,
         'form': form,
+        'related': [row.related for row in related],
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@csrf_exempt
+@require_POST
+@never_cache
+def post_view_beacon(request, post_id):
+    """
+    Учёт просмотра и счётчик для страницы поста. Страница приходит из
+    кеша браузера или как 304 без тела, поэтому при каждом показе она
+    отправляет этот некешируемый запрос.
+    """
+    post = get_cached_object_or_404(Post, pk=post_id)
+    record_view(request, post.pk)
+    return JsonResponse({'views': post_views(post.pk)})
+
+
 @login_required
 def post_create(request):
     if request.method != 'POST':
@@ -96,7 +192,8 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    # Правится свежий экземпляр из базы, не общий закешированный
+    post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id=post_id)
     if request.method != "POST":
@@ -116,7 +213,7 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_cached_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -128,12 +225,16 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts, next_cursor = cursor_page(
+        request, subscription_feeds(request.user), POSTS_PER_PAGE)
+    # Номера страниц заменяет курсор; Page остаётся для шаблонов
+    page_obj = Paginator(posts, POSTS_PER_PAGE).page(1)
     context = {
         'page_obj': page_obj,
+        'cursor': request.GET.get('cursor', ''),
+        'next_cursor': next_cursor,
+        'tags': ('posts', f'user:{request.user.pk}'),
+        'suggestions': suggested_authors(request.user),
     }
 
     return render(request, 'posts/follow.html', context)
@@ -142,7 +243,8 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     if username != request.user.username:
-        author_wanna_follow = User.objects.get(username=username)
+        author_wanna_follow = get_cached_object_or_404(
+            User, username=username)
         Follow.objects.get_or_create(user=request.user,
                                      author=author_wanna_follow)
     return redirect('posts:profile', username=username)
@@ -150,16 +252,58 @@ def profile_follow(request, username):
 
 @login_required
 def profile_unfollow(request, username):
-    author_stop_follow = User.objects.get(username=username)
-    follow_object = Follow.objects.filter(user=request.user,
-                                          author=author_stop_follow)
-    if follow_object.exists():
-        follow_object.delete()
+    author_stop_follow = get_cached_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user,
+                          author=author_stop_follow).delete()
     return redirect('posts:profile', username=username)
 
 
+@login_required
+def group_follow(request, slug):
+    group = get_cached_object_or_404(Group, slug=slug)
+    GroupFollow.objects.get_or_create(user=request.user, group=group)
+    return redirect('posts:group_posts', slug=slug)
+
+
+@login_required
+def group_unfollow(request, slug):
+    group = get_cached_object_or_404(Group, slug=slug)
+    GroupFollow.objects.filter(user=request.user, group=group).delete()
+    return redirect('posts:group_posts', slug=slug)
+
+
 def post_delete(request, post_id):
     post_to_delete = Post.objects.filter(id=post_id)
     if post_to_delete.exists():
         post_to_delete.delete()
     return redirect('posts:index')
+
+
+@login_required
+def export_list(request):
+    if request.method == 'POST':
+        schedule_export(request.user)
+        return redirect('posts:export_list')
+    exports = request.user.exports.all()[:10]
+    return render(request, 'posts/export.html', {'exports': exports})
+
+
+@login_required
+def export_download(request, export_id):
+    export = get_object_or_404(DataExport, pk=export_id, user=request.user,
+                               status=DataExport.DONE)
+    response = send_file(
+        request, os.path.join(settings.EXPORTS_ROOT, export.archive),
+        settings.EXPORTS_ACCEL_PREFIX + export.archive)
+    response['Content-Disposition'] = (
+        f'attachment; filename="yatube-{export.pk}.zip"')
+    return response
+
+
+def sitemap(request, name=INDEX_NAME):
+    """Отдаёт файлы карты сайта, заранее собранные build_sitemaps."""
+    if not (name.startswith('sitemap') and name.endswith('.xml')):
+        raise Http404
+    return send_file(
+        request, os.path.join(settings.SITEMAPS_ROOT, name),
+        settings.SITEMAPS_ACCEL_PREFIX + name)
@@ -11,19 +11,34 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Профиль окружения: development (по умолчанию) или production.
+# В production не подключаются отладочные приложения, включены
+# постоянные соединения с БД и кеширование скомпилированных шаблонов.
+PROFILE = os.getenv('DJANGO_PROFILE', 'development')
+PRODUCTION = PROFILE == 'production'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv(
+    'SECRET_KEY', '' if PRODUCTION else 'development-only-secret-key')
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = False
+DEBUG = os.getenv('DEBUG', '') == '1'
 
-ALLOWED_HOSTS = ['testserver', '127.0.0.1', 'localhost', '[::1]', 'www.ilyasurkov1994.pythonanywhere.com', 'ilyasurkov1994.pythonanywhere.com', ]
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', ','.join([
+    'testserver', '127.0.0.1', 'localhost', '[::1]',
+    'www.ilyasurkov1994.pythonanywhere.com',
+    'ilyasurkov1994.pythonanywhere.com',
+])).split(',')
 
 
 # Application definition
@@ -33,6 +48,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -40,7 +56,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
@@ -51,9 +66,19 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
 ]
 
+# Отладочные приложения подключаются только вне production и только если
+# установлены: find_spec не импортирует модуль при старте процесса.
+DEBUG_APPS = [
+    app for app in ('debug_toolbar',)
+    if not PRODUCTION and find_spec(app) is not None
+]
+INSTALLED_APPS += DEBUG_APPS
+if 'debug_toolbar' in DEBUG_APPS:
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -65,7 +90,7 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': not PRODUCTION,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -78,6 +103,14 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -88,6 +121,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(
+            os.getenv('CONN_MAX_AGE', '600' if PRODUCTION else '0')),
     }
 }
 
@@ -131,6 +166,13 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# В production collectstatic хеширует имена файлов и сжимает их в .gz/.br,
+# а StaticFilesApp (yatube/wsgi.py) раздаёт их с долгим кешированием.
+if PRODUCTION:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = os.getenv('SERVE_STATIC', '1' if PRODUCTION else '') == '1'
 
 # yatube/settings.py
 
@@ -145,6 +187,35 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 
 POSTS_PER_PAGE = 10
+# Длина начала текста поста в словах: карточки лент и заголовок страницы
+POST_EXCERPT_WORDS = 30
+# Миниатюр на странице галереи
+GALLERY_PAGE_SIZE = 24
+# Число постов для пагинатора кешируется до изменения постов или подписок
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Вкладка "Популярное": число постов, период полураспада очков и порог,
+# ниже которого пост выпадает из таблицы
+TRENDING_SIZE = 20
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_MIN_SCORE = 0.05
+# Похожие посты на странице поста; их и TF-IDF индекс текстов пересчитывает
+# команда build_related
+RELATED_POSTS = 5
+RELATED_ROOT = os.path.join(BASE_DIR, 'related')
+# Уникальные просмотры поста: точность HyperLogLog (2 ** p байт на пост,
+# ошибка около 1.6% при p=12), период слияния буфера процесса в кеш и срок
+# хранения скетча в кеше; в базу их переносит flush_post_views
+POST_VIEWS_PRECISION = 12
+POST_VIEWS_MERGE_INTERVAL = 10
+POST_VIEWS_CACHE_TIMEOUT = 60 * 60 * 24
+# Сколько секунд анонимные страницы могут храниться в общих кешах (CDN)
+PAGE_CACHE_MAX_AGE = 60
+
+# RSS/Atom: число постов в ленте и срок хранения готового XML в кеше
+# (ленты инвалидируются версией при сохранении поста, поэтому срок большой)
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -152,9 +223,64 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-
+# Передача медиафайлов прокси: '' — отдаёт само приложение,
+# 'nginx' — X-Accel-Redirect на internal-location MEDIA_ACCEL_PREFIX,
+# 'sendfile' — X-Sendfile (Apache mod_xsendfile, lighttpd).
+MEDIA_ACCEL = os.getenv('MEDIA_ACCEL', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Архивы выгрузок данных пользователей; каталог не раздаётся напрямую,
+# скачивание идёт через view с проверкой владельца.
+EXPORTS_ROOT = os.path.join(BASE_DIR, 'exports')
+EXPORTS_ACCEL_PREFIX = '/protected-exports/'
+# Сборка дольше этого (секунды) считается брошенной: build_exports
+# забирает её заново
+EXPORT_CLAIM_TIMEOUT = 60 * 60
+# Сколько прежних выгрузок пользователя хранится при запросе новой
+EXPORTS_KEEP = 2
+
+# Карты сайта собирает команда build_sitemaps; адреса в них абсолютные.
+SITE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
+SITEMAPS_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAPS_ACCEL_PREFIX = '/protected-sitemaps/'
+# Предел протокола sitemaps.org — 50 000 адресов в файле
+SITEMAP_SHARD_SIZE = 50000
+
+# Экземпляры Post, Group и User по pk, slug и username; сбрасываются
+# сигналами записи
+OBJECT_CACHE_TIMEOUT = 60 * 60
+# Поля, которыми ограничены закешированные экземпляры: хеш пароля и
+# прочие данные учётной записи в общий кеш не попадают
+OBJECT_CACHE_FIELDS = {
+    'auth.user': ('id', 'username', 'first_name', 'last_name'),
+}
+# Карточки постов в лентах; ключ меняется с Post.updated, а срок
+# ограничивает устаревание имён авторов и названий групп
+CARD_CACHE_TIMEOUT = 60 * 60
+# Массивы id авторов, на которых подписан пользователь
+FOLLOW_CACHE_TIMEOUT = 60 * 60 * 24
+# Отсутствие объекта по pk, slug или username (боты, битые ссылки)
+NOT_FOUND_CACHE_TIMEOUT = 60
+# Отрисованная страница 404 для анонимных посетителей
+NOT_FOUND_PAGE_TIMEOUT = 60 * 60
+# Блокировка загрузки при промахе кеша: срок жизни и ожидание, секунды
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 1
+# Сколько секунд после срока запись ещё отдаётся, пока её пересчитывают
+CACHE_STALE_TIMEOUT = 60
+# Адреса миниатюр sorl-thumbnail
+THUMBNAIL_URL_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Кеш процесса по умолчанию; счётчикам просмотров и блокировкам нескольких
+# процессов нужен общий: memcached, база или файлы
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
+
+# Лог медленных SQL-запросов с планом выполнения (EXPLAIN QUERY PLAN)
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', '') == '1'
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))